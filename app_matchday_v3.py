@@ -14,6 +14,7 @@
 
 
 import json
+import numpy as np
 import pandas as pd
 import streamlit as st
 import unicodedata
@@ -168,10 +169,14 @@ def norm_team(x: str) -> str:
     x = unicodedata.normalize("NFKC", x)
     return " ".join(x.split())
 
+LIGHT_GREEN = 0.55
+LIGHT_YELLOW = 0.40
+
+
 def traffic_light(p: float) -> str:
-    if p >= 0.55:
+    if p >= LIGHT_GREEN:
         return "🟢"
-    if p >= 0.40:
+    if p >= LIGHT_YELLOW:
         return "🟡"
     return "🔴"
 
@@ -189,82 +194,137 @@ def confidence_light(conf: float) -> str:
     return "🔴"
 
 
-def build_matchday_table(day):
+STRENGTH_ALPHA = 0.08
+P_FLOOR = 0.01
 
-    fx = fixtures[fixtures.matchday == day].copy()
-    rows = []
 
-    for _, r in fx.iterrows():
+def lights(p: np.ndarray) -> np.ndarray:
+    """traffic_light() for arrays (NaN → ⚪)."""
+    return np.select([p >= LIGHT_GREEN, p >= LIGHT_YELLOW, np.isnan(p)], ["🟢", "🟡", "⚪"], "🔴")
 
-        home = r.home_team
-        away = r.away_team
-    
-        home_n = norm_team(home)
-        away_n = norm_team(away)
 
-        
-        ph = previews[(previews.team_n == home_n) & (previews.is_home == 1)].iloc[0]
-        pa = previews[(previews.team_n == away_n) & (previews.is_home == 0)].iloc[0]
+def fmt_prob(p: np.ndarray) -> list:
+    return [f"{l} {round(x * 100)}%" if np.isfinite(x) else f"{l} n/a" for l, x in zip(lights(p), p)]
 
-        # base probabilities
-        p_home = ph.p_win
-        p_draw = (ph.p_draw + pa.p_draw) / 2
-        p_away = 1 - p_home - p_draw
 
-        # strength adjustment
-        alpha = 0.08
-        s_home = team_strength.get(home_n, 0.0)
-        s_away = team_strength.get(away_n, 0.0)
+def compute_matchday_probs(fx: pd.DataFrame, previews: pd.DataFrame, team_strength) -> pd.DataFrame:
+    """
+    All fixtures at once:
+    previews indexed by (team_n, is_home) → one reindex per side,
+    strength adjustment + floor + renormalization as array ops.
+    Teams without a preview (or without p_win) → NaN probabilities.
+    """
+    n = len(fx)
+    home_n = fx["home_n"].to_numpy(dtype=object)
+    away_n = fx["away_n"].to_numpy(dtype=object)
 
-        adj = alpha * (s_home - s_away)
+    if previews.empty or "team_n" not in previews:
+        ph_win = ph_draw = pa_draw = np.full(n, np.nan)
+    else:
+        pv = (
+            previews.drop_duplicates(["team_n", "is_home"])        # == .iloc[0]
+                    .set_index(["team_n", "is_home"])[["p_win", "p_draw"]]
+        )
+        ph = pv.reindex(pd.MultiIndex.from_arrays([home_n, np.ones(n, dtype=int)]))
+        pa = pv.reindex(pd.MultiIndex.from_arrays([away_n, np.zeros(n, dtype=int)]))
+        ph_win = ph["p_win"].to_numpy(dtype=float)
+        ph_draw = ph["p_draw"].to_numpy(dtype=float)
+        pa_draw = pa["p_draw"].to_numpy(dtype=float)
+
+    # base probabilities
+    p_home = ph_win
+    p_draw = (ph_draw + pa_draw) / 2
+    p_away = 1 - p_home - p_draw
+
+    # strength adjustment
+    if isinstance(team_strength, pd.Series) and not team_strength.empty:
+        s_home = team_strength.reindex(home_n).fillna(0.0).to_numpy(dtype=float)
+        s_away = team_strength.reindex(away_n).fillna(0.0).to_numpy(dtype=float)
+    else:
+        s_home = s_away = np.zeros(n)
 
-        p_home += adj
-        p_away -= adj
+    adj = STRENGTH_ALPHA * (s_home - s_away)
+    p = np.column_stack([p_home + adj, p_draw, p_away - adj])
 
-        # floor + renormalize
-        p_home = max(0.01, p_home)
-        p_draw = max(0.01, p_draw)
-        p_away = max(0.01, p_away)
+    # floor + renormalize (NaN stays NaN → "n/a")
+    p = np.maximum(p, P_FLOOR)
+    p /= p.sum(axis=1, keepdims=True)
 
-        Z = p_home + p_draw + p_away
-        p_home /= Z
-        p_draw /= Z
-        p_away /= Z
+    return pd.DataFrame(
+        {"p_home": p[:, 0], "p_draw": p[:, 1], "p_away": p[:, 2]},
+        index=fx.index,
+    )
 
-        # diagnostics
-        rel_form = int(ph.form - pa.form)
-        
-        state = f"({rel_form},1)"
 
-        rows.append({
-            "Home Team": home,
-            "Away Team": away,
-            "Home Win": f"{traffic_light(p_home)} {round(p_home*100)}%",
-            "Draw":     f"{traffic_light(p_draw*100/100)} {round(p_draw*100)}%",
-            "Away Win": f"{traffic_light(p_away)} {round(p_away*100)}%",
-        })
-  
-    return pd.DataFrame(rows)
+@st.cache_data
+def matchday_table(league: str, day, version: tuple, _fixtures, _previews, _team_strength):
+    """
+    Cached per (league, day); `version` = mtimes of the league files, so a
+    data refresh invalidates the cache. Underscore args are not hashed.
+    """
+    fx = _fixtures[_fixtures.matchday == day]
+    probs = compute_matchday_probs(fx, _previews, _team_strength)
 
-def render_financial_risk():
+    return pd.DataFrame({
+        "Home Team": fx["home_team"].to_numpy(),
+        "Away Team": fx["away_team"].to_numpy(),
+        "Home Win": fmt_prob(probs["p_home"].to_numpy()),
+        "Draw":     fmt_prob(probs["p_draw"].to_numpy()),
+        "Away Win": fmt_prob(probs["p_away"].to_numpy()),
+    })
 
-    DATA_DIR = MARKOV_ROOT / "financial" / "data"
 
+def data_version(data_dir: Path) -> tuple:
+    files = ("upcoming_fixtures.csv", "fixture_previews.json", "team_matches.csv")
+    return tuple((data_dir / f).stat().st_mtime if (data_dir / f).exists() else 0.0 for f in files)
+
+
+def build_matchday_table(day):
+    return matchday_table(LEAGUE, day, data_version(DATA_DIR), fixtures, previews, team_strength)
+
+@st.cache_data
+def load_financial_snapshot(path: Path, mtime: float):
+    """Konsolidierter Snapshot in einem Read (mtime = Cache-Key)."""
+    from financial.risk_snapshot import load_snapshot
+    return load_snapshot(path)
+
+
+def financial_rows_from_snapshot(snap: dict) -> pd.DataFrame:
+    freqs = [str(f) for f in snap["freqs"]]
+    cols = {"D": freqs.index("daily"), "W": freqs.index("weekly"), "M": freqs.index("monthly")}
+
+    # D als Master-Key-Set (wie bei den JSON-Files)
+    keep = ~np.isnan(snap["p_up"][:, cols["D"]])
+    keys = snap["key"][keep].astype(str)
+    p = snap["p_up"][keep].copy()
+
+    # Credit semantics: p_up = Stress ↑ (Risk-Off) → invert for display (Risk-On)
+    is_credit = np.char.find(np.char.lower(keys), "credit") >= 0
+    p[is_credit] = 1 - p[is_credit]
+
+    return pd.DataFrame({
+        "Region": snap["region"][keep].astype(str),
+        "Index": snap["label"][keep].astype(str),
+        **{c: p[:, j] for c, j in cols.items()},
+    })
+
+
+def financial_rows_from_json(data_dir: Path):
     files = {
         "D": [
-            DATA_DIR / "equity_probabilities_daily.json",
-            DATA_DIR / "credit_probabilities_daily.json",
-            DATA_DIR / "vix_probabilities_daily.json",
+            data_dir / "equity_probabilities_daily.json",
+            data_dir / "credit_probabilities_daily.json",
+            data_dir / "vix_probabilities_daily.json",
         ],
         "W": [
-            DATA_DIR / "equity_probabilities_weekly.json",
-            DATA_DIR / "credit_probabilities_weekly.json",
-            DATA_DIR / "vix_probabilities_weekly.json",
+            data_dir / "equity_probabilities_weekly.json",
+            data_dir / "credit_probabilities_weekly.json",
+            data_dir / "vix_probabilities_weekly.json",
         ],
         "M": [
-            DATA_DIR / "equity_probabilities_monthly.json",
-            DATA_DIR / "credit_probabilities_monthly.json",
-            DATA_DIR / "vix_probabilities_monthly.json",
+            data_dir / "equity_probabilities_monthly.json",
+            data_dir / "credit_probabilities_monthly.json",
+            data_dir / "vix_probabilities_monthly.json",
         ],
     }
 
@@ -275,7 +335,7 @@ def render_financial_risk():
         for p in files[freq]:
             if not p.exists():
                 st.warning(f"Missing {p.name}")
-                return
+                return None
             js = load_json(p)
             idx = js.get("indices", {})
             if isinstance(idx, dict):
@@ -305,7 +365,28 @@ def render_financial_risk():
             "M": p_m,
         })
 
-    df = pd.DataFrame(rows)
+    return pd.DataFrame(rows)
+
+
+def render_financial_risk():
+
+    DATA_DIR = MARKOV_ROOT / "financial" / "data"
+    SNAPSHOT = DATA_DIR / "financial_snapshot.npz"
+
+    # ── ein Read (Snapshot), Fallback: neun JSON-Files
+    #    (auch wenn ein JSON neuer ist als der Snapshot)
+    df = None
+    json_mtime = max((p.stat().st_mtime for p in DATA_DIR.glob("*_probabilities_*.json")), default=0.0)
+    if SNAPSHOT.exists() and SNAPSHOT.stat().st_mtime >= json_mtime:
+        try:
+            snap = load_financial_snapshot(SNAPSHOT, SNAPSHOT.stat().st_mtime)
+            df = financial_rows_from_snapshot(snap)
+        except (ValueError, KeyError):
+            df = None
+    if df is None:
+        df = financial_rows_from_json(DATA_DIR)
+        if df is None:
+            return
 
     def fmt(p):
         if p is None or pd.isna(p):
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ======================================================================
+# 📶 build_highlow_monitor.py
+# Breadth-Monitor NASDAQ-100 → highlow_monitor.json (check_cron_health)
+#  - Price-Panel "nasdaq100" (vom Screener geschrieben, sonst neu laden)
+#  - Rolling N-Tage-Hochs/-Tiefs + Anteile über alle Constituents
+#    (tools/breadth.py, ein NumPy-Pass über Dates × Ticker)
+#  - Regime-Breadth: Anteil Ticker mit p_up_week ≥ Threshold für den
+#    neuesten Bar (wie der Screener, nur auf dem benötigten Panel-Tail)
+#  - Inkrementell: State (letzte N Zeilen) im Cache → nachts wird nur
+#    der neueste Bar verarbeitet; Adjusted-Restatements (Split/Dividende)
+#    reskalieren den State, --full baut die Historie neu
+#
+#  Usage:
+#    python core/build_highlow_monitor.py             # Preise aktualisieren + inkrementell
+#    python core/build_highlow_monitor.py --offline   # nur vorhandenes Panel
+#    python core/build_highlow_monitor.py --full      # Historie + State neu aufbauen
+# ======================================================================
+
+import os
+import sys
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────────────────────
+# 🧩 PATH BOOTSTRAP
+# ─────────────────────────────────────────────────────────────
+MARKOV_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if MARKOV_ROOT not in sys.path:
+    sys.path.insert(0, MARKOV_ROOT)
+
+from core.universe_nasdaq100 import TICKERS, UNIVERSE
+from financial.price_loader import load_prices
+from tools.breadth import WINDOW, BreadthState, breadth_history, regime_breadth
+from tools.markov_core_v4 import panel_p_up_multi, panel_thresholds
+from tools.price_panel import PricePanel, open_panel
+
+# ─────────────────────────────────────────────────────────────
+# 🧠 BASIS-PFADE
+# ─────────────────────────────────────────────────────────────
+BASE = os.path.expanduser("~/Documents/Python_for_Finance/Markov")
+PATH_MONITOR = os.path.join(BASE, "highlow_monitor.json")
+PATH_HISTORY = os.path.join(BASE, "highlow_history.csv")
+STATE_PATH = os.path.join(
+    os.environ.get("BREADTH_STATE_DIR", os.path.join(MARKOV_ROOT, "cache", "breadth")),
+    "highlow_state.npz",
+)
+
+# ─────────────────────────────────────────────────────────────
+# ⚙️ Settings
+# ─────────────────────────────────────────────────────────────
+PANEL_NAME = "nasdaq100"
+BREADTH_HORIZON = "p_up_week"
+BREADTH_WINDOWS = {"p_up_week": ("weekly", 5)}   # Label/Horizon wie panel_trend_matrix
+HISTORY_COLS = ["high_share", "low_share", "n_highs", "n_lows", "n_eligible"]
+
+
+# ─────────────────────────────────────────────────────────────
+# 🧮 Core
+# ─────────────────────────────────────────────────────────────
+def _load_history(path: str) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=HISTORY_COLS, index=pd.DatetimeIndex([], name="date"))
+    return pd.read_csv(path, index_col="date", parse_dates=["date"])
+
+
+def _save_history(hist: pd.DataFrame, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    hist[HISTORY_COLS].to_csv(tmp, index_label="date", float_format="%.6f", date_format="%Y-%m-%d")
+    os.replace(tmp, path)
+
+
+def update_highlow(frame: pd.DataFrame, window: int = WINDOW, full: bool = False,
+                   state_path: str = STATE_PATH, history_path: str = PATH_HISTORY) -> pd.DataFrame:
+    """
+    High/Low-Historie auf den Stand von `frame` bringen.
+    Mit gültigem State nur die Bars nach state.last_date; restatete Adjusted
+    Closes (reiner Faktor je Ticker) werden in den State übernommen. Voller
+    Batch-Pass nur ohne State oder bei Revisionen, die kein Faktor sind.
+    """
+    state = None if full else BreadthState.load(state_path)
+    if state is not None and state.window != window:
+        state = None
+
+    hist = None if state is None else _load_history(history_path)
+    if (
+        state is None
+        or (len(hist) and hist.index[-1] != state.last_date)
+        or not state.rebase(frame)
+    ):
+        # kein / inkonsistenter / revidierter State → Historie komplett neu
+        hist = breadth_history(frame, window)
+        state = BreadthState.from_panel(frame, window)
+        print(f"🧱 High/Low-Historie neu: {len(hist)} Bars")
+    else:
+        new = frame.loc[frame.index > state.last_date]
+        rows = [state.update(date, row) for date, row in new.iterrows()]
+        if rows:
+            add = pd.DataFrame(rows).set_index("date")
+            add = add[add["n_eligible"] > 0]
+            hist = pd.concat([hist, add[HISTORY_COLS]])
+        print(f"➕ High/Low inkrementell: {len(rows)} neue Bar(s)")
+
+    state.save(state_path)
+    _save_history(hist, history_path)
+    return hist
+
+
+def latest_regime_breadth(frame: pd.DataFrame, horizon: str = BREADTH_HORIZON) -> float:
+    """
+    Regime-Breadth des neuesten Bars: p_up des Horizons + Default-Threshold
+    je Ticker (wie panel_trend_matrix), beide nur auf dem nötigen Tail.
+    """
+    label, h = BREADTH_WINDOWS[horizon]
+    p_up = panel_p_up_multi(frame, {label: h})[(label, "p_up")]
+    thr = panel_thresholds(frame).reindex(p_up.index).fillna(0.55)
+    return regime_breadth(p_up, thr)
+
+
+def run_highlow_monitor(offline: bool = False, full: bool = False, window: int = WINDOW,
+                        out_path: str = PATH_MONITOR) -> dict:
+    if offline:
+        panel = open_panel(PANEL_NAME)
+        if panel is None:
+            raise SystemExit(f"❌ Kein Price-Panel '{PANEL_NAME}' gefunden (erst ohne --offline laufen lassen).")
+    else:
+        print(f"📥 Lade {len(TICKERS)} Ticker …")
+        panel = PricePanel.write(load_prices(TICKERS), name=PANEL_NAME)
+
+    t0 = time.perf_counter()
+    frame = panel.frame()
+    hist = update_highlow(frame, window, full=full)
+    if hist.empty:
+        raise SystemExit(f"❌ Zu wenig Historie für ein {window}-Tage-Fenster.")
+    last = hist.iloc[-1]
+
+    breadth = latest_regime_breadth(frame)
+    dt = time.perf_counter() - t0
+
+    out = {
+        "date": hist.index[-1].strftime("%Y-%m-%d"),
+        "universe": UNIVERSE,
+        "window": int(window),
+        "high_share": round(float(last["high_share"]), 4),
+        "low_share": round(float(last["low_share"]), 4),
+        "n_highs": int(last["n_highs"]),
+        "n_lows": int(last["n_lows"]),
+        "n_eligible": int(last["n_eligible"]),
+        "regime_breadth": round(breadth, 4) if np.isfinite(breadth) else None,
+        "regime_horizon": BREADTH_HORIZON,
+        "updated": datetime.now().isoformat(timespec="seconds"),
+    }
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=2, ensure_ascii=False)
+
+    print(f"📶 {out['date']}  high={out['high_share']:.3f}  low={out['low_share']:.3f}  "
+          f"breadth={out['regime_breadth']}  ({out['n_eligible']} Ticker, {dt * 1e3:.0f} ms)")
+    print(f"💾 {out_path}")
+    return out
+
+
+if __name__ == "__main__":
+    run_highlow_monitor(offline="--offline" in sys.argv, full="--full" in sys.argv)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------
+#  Overall Regime Builder – Meta-Markov Konsens für den Daily Trader
+#  • Serien aus der Financial-Registry (Equity, HY/IG-Spread, −log(VIX))
+#  • Joint-State Meta-Markov (tools/meta_markov.py)
+#  • Schreibt overall_regime.json (BULL / BEAR / NEUTRAL + Wahrscheinlichkeiten)
+#
+#  Usage:
+#    python core/build_overall_regime.py            # weekly (5d)
+#    python core/build_overall_regime.py monthly    # 21d
+# ------------------------------------------------------------------
+
+import os
+import sys
+import json
+from datetime import datetime
+
+import pandas as pd
+
+# ------------------------------------------------------------------
+# 🧩 PATH BOOTSTRAP
+# ------------------------------------------------------------------
+MARKOV_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if MARKOV_ROOT not in sys.path:
+    sys.path.insert(0, MARKOV_ROOT)
+
+from financial.financial_pipeline import WINDOWS, normalized_closes, transformed_series
+from financial.price_loader import load_prices
+from financial.series_registry import build_registry, required_tickers
+from tools.meta_markov import MetaMarkov
+
+# ------------------------------------------------------------------
+# 🧠 BASIS-PFADE
+# ------------------------------------------------------------------
+BASE = os.path.expanduser("~/Documents/Python_for_Finance/Markov")
+PATH_OVERALL = os.path.join(BASE, "overall_regime.json")
+
+# ---------------------- Settings ----------------------
+DEFAULT_FREQ = "weekly"
+LOOKBACK_BARS = 1260      # ~5 Jahre gemeinsamer Historie
+# -------------------------------------------------------
+
+
+def build_overall_regime(prices=None, freq: str = DEFAULT_FREQ, out_path: str = PATH_OVERALL) -> dict:
+    """
+    Meta-Markov über alle Registry-Serien.
+    prices: optional geteilter {ticker: df}-Dict (siehe update_financial_all)
+    """
+    registry = build_registry()
+    tickers = required_tickers(registry)
+
+    prices = {} if prices is None else prices
+    missing = [tk for tk in tickers if tk not in prices]
+    if missing:
+        prices.update(load_prices(missing))
+
+    series = transformed_series(registry, normalized_closes(tickers, prices))
+    if not series:
+        raise RuntimeError("❌ no series available for overall regime")
+
+    closes = pd.concat(series, axis=1).dropna().sort_index().tail(LOOKBACK_BARS)
+
+    model = MetaMarkov().fit(closes, horizon=WINDOWS[freq])
+    res = model.predict()
+
+    out = {
+        "date": closes.index[-1].strftime("%Y-%m-%d"),
+        "overall_regime": res["regime"],
+        "frequency": freq,
+        "probabilities": res["probabilities"],
+        "prior": res["prior"],
+        "n_joint": res["n_joint"],
+        "joint_state": res["joint_state"],
+        "observed_states": res["observed_states"],
+        "asset_states": res["asset_states"],
+        "assets": list(series),
+        "bars": int(len(closes)),
+        "updated": datetime.now().isoformat(timespec="seconds"),
+    }
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=2, ensure_ascii=False)
+
+    p = res["probabilities"]
+    print(f"🧭 Overall-Regime={res['regime']}  "
+          f"(BULL {p['BULL']:.2f} · NEUTRAL {p['NEUTRAL']:.2f} · BEAR {p['BEAR']:.2f}, n={res['n_joint']})")
+    print(f"💾 {out_path}")
+    return out
+
+
+if __name__ == "__main__":
+    build_overall_regime(freq=sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FREQ)
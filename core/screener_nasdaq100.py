@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ======================================================================
+# 🔎 screener_nasdaq100.py
+# Fusion-Screener NASDAQ-100 → fusion_bias_nasdaq100_{weekly,monthly}.json
+#  - Preise über den inkrementellen Cache → Price-Panel "nasdaq100"
+#  - Ein vektorisierter Pass: panel_trend_matrix (p_up d/w/m + Threshold)
+#  - Weekly-Fusion : p_up_week  & p_up_daily über/unter Threshold
+#    Monthly-Fusion: p_up_month & p_up_week  über/unter Threshold
+#  - double_longs / double_shorts / ratio / sentiment für update_market_bias
+#
+#  Usage:
+#    python core/screener_nasdaq100.py            # Preise aktualisieren + screenen
+#    python core/screener_nasdaq100.py --offline  # nur vorhandenes Panel
+# ======================================================================
+
+import os
+import sys
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────────────────────
+# 🧩 PATH BOOTSTRAP
+# ─────────────────────────────────────────────────────────────
+MARKOV_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if MARKOV_ROOT not in sys.path:
+    sys.path.insert(0, MARKOV_ROOT)
+
+from core.universe_nasdaq100 import TICKERS
+from financial.price_loader import load_prices
+from tools.markov_core_v4 import panel_trend_matrix
+from tools.price_panel import PricePanel, open_panel
+
+# ─────────────────────────────────────────────────────────────
+# ⚙️ Settings
+# ─────────────────────────────────────────────────────────────
+PANEL_NAME = "nasdaq100"
+
+# Ausgabepfade wie in core/update_market_bias.py (dort importieren hätte
+# os.makedirs auf dem festen /Users/…-Pfad als Seiteneffekt)
+BASE_MARKOV = "/Users/michelweiss/Documents/Python_for_Finance/Markov"
+TRADER_DIR = os.path.join(BASE_MARKOV, "trader")
+INTRA_DIR = os.path.join(TRADER_DIR, "intraday_trader")
+LEGACY_DIR = os.path.join(TRADER_DIR, "day_trading")
+OUT_DIR = LEGACY_DIR if not os.path.exists(INTRA_DIR) and os.path.exists(LEGACY_DIR) else INTRA_DIR
+
+WEEKLY_FILE = os.path.join(OUT_DIR, "fusion_bias_nasdaq100_weekly.json")
+MONTHLY_FILE = os.path.join(OUT_DIR, "fusion_bias_nasdaq100_monthly.json")
+
+FUSION = {
+    # freq: (primärer Horizont, Bestätigung)
+    "weekly":  ("p_up_week",  "p_up_daily"),
+    "monthly": ("p_up_month", "p_up_week"),
+}
+OUT_FILES = {"weekly": WEEKLY_FILE, "monthly": MONTHLY_FILE}
+
+RATIO_BULL = 0.60        # ratio ≥ → BULL
+RATIO_BEAR = 0.40        # ratio ≤ → BEAR
+RATIO_STRONG = 0.75      # ratio ≥ (bzw. ≤ 1−) → Leverage 2×
+LEVERAGE_STRONG = 2.0
+
+
+# ─────────────────────────────────────────────────────────────
+# 🧮 Core
+# ─────────────────────────────────────────────────────────────
+def _symbol(ticker: str) -> str:
+    return ticker[:-3] if ticker.endswith(".US") else ticker
+
+
+def screen(panel: pd.DataFrame) -> pd.DataFrame:
+    """Trend-Matrix für alle Ticker eines Close-Panels (ein NumPy-Pass)."""
+    tm = panel_trend_matrix(panel)
+    tm.index = pd.Index([_symbol(t) for t in tm.index], name="Ticker")
+    return tm
+
+
+def fusion_bias(tm: pd.DataFrame, freq: str, as_of: str) -> dict:
+    """
+    double_longs / double_shorts aus zwei Horizonten + Threshold je Ticker.
+    Long: beide p_up ≥ max(thr, 1−thr), Short: beide ≤ 1 − max(thr, 1−thr)
+    → die beiden Listen sind disjunkt.
+    """
+    primary, confirm = FUSION[freq]
+    thr = tm["Threshold"].to_numpy()
+    p1 = tm[primary].to_numpy()
+    p2 = tm[confirm].to_numpy()
+
+    # symmetrisches Band: Optimizer-Thresholds < 0.5 würden sonst Long-
+    # und Short-Bedingung überlappen lassen
+    hi = np.maximum(thr, 1 - thr)
+    lo = 1 - hi
+
+    with np.errstate(invalid="ignore"):
+        longs = (p1 >= hi) & (p2 >= hi)
+        shorts = (p1 <= lo) & (p2 <= lo) & ~longs   # ~longs: Gleichstand bei thr = 0.5
+
+    names = tm.index.to_numpy()
+    n_long, n_short = int(longs.sum()), int(shorts.sum())
+    ratio = n_long / (n_long + n_short) if (n_long + n_short) else 0.5
+
+    if ratio >= RATIO_BULL:
+        sentiment = "BULL"
+    elif ratio <= RATIO_BEAR:
+        sentiment = "BEAR"
+    else:
+        sentiment = "NEUTRAL"
+
+    # stärkste Kandidaten zuerst
+    order_l = np.argsort(-p1[longs], kind="stable")
+    order_s = np.argsort(p1[shorts], kind="stable")
+
+    return {
+        "as_of": as_of,
+        "frequency": freq,
+        "universe": "NASDAQ100",
+        "n_constituents": int(np.isfinite(p1).sum()),
+        "double_longs": [str(t) for t in names[longs][order_l]],
+        "double_shorts": [str(t) for t in names[shorts][order_s]],
+        "ratio": round(float(ratio), 3),
+        "sentiment": sentiment,
+        "leverage_long": LEVERAGE_STRONG if ratio >= RATIO_STRONG else 1.0,
+        "leverage_short": LEVERAGE_STRONG if ratio <= 1 - RATIO_STRONG else 1.0,
+        "updated": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def run_screener(offline: bool = False, freqs=tuple(FUSION), out_files=None) -> dict:
+    out_files = out_files or OUT_FILES
+
+    if offline:
+        panel = open_panel(PANEL_NAME)
+        if panel is None:
+            raise SystemExit(f"❌ Kein Price-Panel '{PANEL_NAME}' gefunden (erst ohne --offline laufen lassen).")
+    else:
+        print(f"📥 Lade {len(TICKERS)} Ticker …")
+        panel = PricePanel.write(load_prices(TICKERS), name=PANEL_NAME)
+
+    t0 = time.perf_counter()
+    frame = panel.frame()
+    tm = screen(frame)
+    as_of = frame.index[-1].strftime("%Y-%m-%d")
+    results = {freq: fusion_bias(tm, freq, as_of) for freq in freqs}
+    dt = time.perf_counter() - t0
+
+    for freq, res in results.items():
+        path = out_files[freq]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2, ensure_ascii=False)
+        print(f"💾 {freq:7s} L={len(res['double_longs']):3d} S={len(res['double_shorts']):3d} "
+              f"ratio={res['ratio']:.3f} → {res['sentiment']}  ({path})")
+
+    print(f"🚀 Screener fertig: {panel.shape[1]} Ticker × {panel.shape[0]} Bars in {dt * 1e3:.0f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    run_screener(offline="--offline" in sys.argv)
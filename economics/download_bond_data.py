@@ -13,7 +13,7 @@ Download US 10Y Treasury yield via EOD
 Used for CPI reaction analysis
 """
 
-import requests
+import sys
 import pandas as pd
 from pathlib import Path
 
@@ -21,7 +21,10 @@ ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "economics" / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
-API_KEY = open("/users/michelweiss/documents/python_for_finance/api_token.txt").read().strip()
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools.price_cache import get_cache
 
 TICKER = "US10Y.GBOND"
 START  = "2000-01-01"
@@ -30,24 +33,11 @@ OUT_FILE = DATA_DIR / "us10y_yield.csv"
 
 def download_us10y():
 
-    url = f"https://eodhd.com/api/eod/{TICKER}"
-    params = {
-        "from": START,
-        "period": "d",
-        "fmt": "json",
-        "api_token": API_KEY,
-    }
-
-    r = requests.get(url, params=params, timeout=30)
-    r.raise_for_status()
-
-    df = pd.DataFrame(r.json())
+    # inkrementeller Cache (nur neue Bars) über den geteilten Session-Pool
+    df = get_cache().get_raw(TICKER, START, resync="--resync" in sys.argv)
     if df.empty:
         raise RuntimeError("Empty US10Y data from EOD")
 
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date").reset_index(drop=True)
-
     # EOD GBOND usually has 'close' = yield level
     px_col = "close" if "close" in df.columns else "adjusted_close"
     df["yield"] = df[px_col].astype(float)
@@ -13,7 +13,7 @@ Download SPX daily returns via EOD Historical Data
 Used for macro reaction analysis
 """
 
-import requests
+import sys
 import pandas as pd
 from pathlib import Path
 
@@ -24,7 +24,10 @@ ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "economics" / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
-API_KEY = open("/users/michelweiss/documents/python_for_finance/api_token.txt").read().strip()
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools.price_cache import get_cache
 
 TICKER = "GSPC.INDX"
 START  = "2000-01-01"
@@ -34,22 +37,8 @@ OUT_FILE = DATA_DIR / "spx_returns.csv"
 
 def download_spx_eod():
 
-    url = (
-        f"https://eodhd.com/api/eod/{TICKER}"
-        f"?from={START}"
-        f"&period=d"
-        f"&fmt=json"
-        f"&api_token={API_KEY}"
-    )
-
-    r = requests.get(url)
-    r.raise_for_status()
-
-    data = r.json()
-    df = pd.DataFrame(data)
-
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date").reset_index(drop=True)
+    # inkrementeller Cache (nur neue Bars) über den geteilten Session-Pool
+    df = get_cache().get_raw(TICKER, START, resync="--resync" in sys.argv)
 
     df["ret_1d"] = df["adjusted_close"].pct_change()
     df = df.dropna()
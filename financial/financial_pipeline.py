@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Financial Probability Pipeline (registry-driven)
+------------------------------------------------
+• Serien aus financial/series_registry.py (equity / credit / vix / SERIES)
+• fetch     : jeder Roh-Ticker genau einmal (über alle Asset-Klassen)
+• normalize : preprocess_prices je Roh-Ticker einmal
+• transform : deklarativ (identity, ratio, spread, neg_log, basket)
+• compute   : ein panel_p_up_multi-Pass für alle Serien × Frequenzen
+• persist   : financial/data/<asset>_probabilities_<freq>.json (Format unverändert)
+• history   : Append an financial/data/history (financial/probability_history.py)
+• snapshot  : jeder Run → financial/data/financial_snapshot.npz (financial/risk_snapshot.py),
+              Teil-Runs mit den JSONs der übrigen Asset-Klassen zusammengeführt
+"""
+
+from datetime import date
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from financial.price_loader import load_prices
+from financial.probability_history import ProbabilityHistory
+from financial.risk_snapshot import write_snapshot
+from financial.series_registry import apply_transform, assets as registry_assets, build_registry, required_tickers
+from tools.markov_core_v4 import panel_p_up_multi, preprocess_prices
+from tools.markov_profile import stage, dump_profile
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+MIN_BARS   = 250
+
+OUT_DIR = Path(__file__).resolve().parent / "data"
+OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+WINDOWS = {
+    "daily": 1,
+    "weekly": 5,
+    "monthly": 21,
+}
+
+
+# ------------------------------------------------------------
+# STAGES
+# ------------------------------------------------------------
+def normalized_closes(tickers: Iterable[str], prices: Dict[str, pd.DataFrame]) -> Dict[str, pd.Series]:
+    closes = {}
+    for tk in tickers:
+        df = prices.get(tk)
+        if df is None or len(df) < MIN_BARS:
+            print(f"⚠️  {tk}: insufficient data")
+            continue
+        df = preprocess_prices(df)
+        if df.empty or "Close" not in df.columns:
+            print(f"⚠️  {tk}: no Close after normalization")
+            continue
+        closes[tk] = df["Close"]
+    return closes
+
+
+def transformed_series(registry, closes: Dict[str, pd.Series]) -> Dict[str, pd.Series]:
+    series = {}
+    for e in registry:
+        tickers = e["tickers"]
+        if any(tk not in closes for tk in tickers):
+            continue
+
+        df = pd.concat([closes[tk] for tk in tickers], axis=1, keys=tickers).dropna().sort_index()
+        if len(df) < MIN_BARS:
+            print(f"⚠️  {e['key']}: insufficient aligned data")
+            continue
+
+        s = apply_transform(df, e["transform"]).dropna()
+        if len(s) < MIN_BARS:
+            print(f"⚠️  {e['key']}: insufficient data after transform")
+            continue
+        series[e["key"]] = s
+    return series
+
+
+def merged_payloads(payloads: Dict[str, Dict[str, dict]], freqs=tuple(WINDOWS)) -> Dict[str, Dict[str, dict]]:
+    """Frisch gerechnete Payloads + zuletzt geschriebene JSONs aller anderen Asset-Klassen."""
+    merged = {}
+    for asset in registry_assets(build_registry()):
+        if asset in payloads:
+            merged[asset] = payloads[asset]
+            continue
+        by_freq = {}
+        for freq in freqs:
+            path = OUT_DIR / f"{asset}_probabilities_{freq}.json"
+            if path.exists():
+                with open(path) as f:
+                    by_freq[freq] = json.load(f)
+        if by_freq:
+            merged[asset] = by_freq
+    return merged
+
+
+# ------------------------------------------------------------
+# CORE
+# ------------------------------------------------------------
+def run_financial_pipeline(
+    assets: Optional[Iterable[str]] = None,
+    freqs=tuple(WINDOWS),
+    prices: Optional[Dict[str, pd.DataFrame]] = None,
+    resync: bool = False,
+) -> Dict[str, Dict[str, dict]]:
+    """
+    Rechnet alle (oder die gewählten) Asset-Klassen in einem Batch.
+    prices: optional geteilter {ticker: df}-Dict; fehlende Ticker werden nachgeladen.
+
+    Rückgabe: {asset: {freq: payload}}
+    """
+    registry = build_registry()
+    full_run = assets is None
+    if assets is not None:
+        assets = list(assets)
+        registry = [e for e in registry if e["asset"] in assets]
+    else:
+        assets = registry_assets(registry)
+
+    tickers = required_tickers(registry)
+    prices = {} if prices is None else prices
+
+    # 1) Fetch – nur was im geteilten Dict noch fehlt
+    with stage("financial.fetch") as st:
+        missing = [tk for tk in tickers if tk not in prices]
+        if missing:
+            prices.update(load_prices(missing, resync=resync))
+        st.rows = sum(len(prices[tk]) for tk in tickers if prices.get(tk) is not None)
+
+    # 2) Normalize – je Roh-Ticker einmal
+    with stage("financial.normalize", rows=len(tickers)):
+        closes = normalized_closes(tickers, prices)
+
+    # 3) Transform
+    with stage("financial.transform", rows=len(registry)):
+        series = transformed_series(registry, closes)
+
+    # 4) Rolling Markov p_up (v4) – alle Serien × Horizonte in einem Pass
+    horizons = {freq: WINDOWS[freq] for freq in freqs}
+    with stage("financial.compute", rows=sum(len(s) for s in series.values())):
+        res = panel_p_up_multi(pd.concat(series, axis=1) if series else None, horizons)
+
+    as_of = date.today().isoformat()
+    payloads = {
+        asset: {
+            freq: {"frequency": freq, "as_of": as_of, "indices": {}}
+            for freq in freqs
+        }
+        for asset in assets
+    }
+
+    for e in registry:
+        if e["key"] not in res.index:
+            continue
+        for freq in freqs:
+            p_up = res.at[e["key"], (freq, "p_up")]
+            n = res.at[e["key"], (freq, "n_samples")]
+
+            if p_up != p_up:  # NaN-Check
+                continue
+
+            payloads[e["asset"]][freq]["indices"][e["key"]] = {
+                "label": e["label"],
+                "region": e["region"],
+                **e["display"],
+                "p_up": round(float(p_up), 4),
+                "n_samples": int(n),
+            }
+
+    # 5) Persist snapshots
+    for asset, by_freq in payloads.items():
+        for freq, payload in by_freq.items():
+            out_file = OUT_DIR / f"{asset}_probabilities_{freq}.json"
+            with stage("financial.persist", rows=len(payload["indices"])):
+                with open(out_file, "w") as f:
+                    json.dump(payload, f, indent=2)
+
+            print(f"✔ {asset} probabilities written: {out_file}")
+
+    # 6) Konsolidierter Snapshot – bei Teil-Runs mit den JSONs der übrigen
+    #    Asset-Klassen zusammengeführt, damit er nie hinter den JSONs zurückliegt
+    with stage("financial.snapshot", rows=len(series)):
+        write_snapshot(payloads if full_run else merged_payloads(payloads, freqs))
+
+    # 7) Append-only History
+    with stage("financial.history") as st:
+        st.rows = ProbabilityHistory().append_payloads(payloads)
+
+    dump_profile(OUT_DIR / "financial_probabilities.profile.json")
+    return payloads
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Financial Price Loader
+----------------------
+• Ein tool_prices-Call je Ticker und Run
+• load_prices lädt parallel über den geteilten Session-Pool (tools.eod_fetch)
+• Inkrementeller On-Disk Cache (tools.price_cache): nur neue Bars werden geladen,
+  resync=True lädt die volle Historie neu
+• `prices` = geteilter Dict {ticker: df}, den alle Builder mitbenutzen
+• Ohne `prices` verhält sich get_prices wie ein direkter tool_prices-Call
+• tool_prices kommt aus tools.eod_fetch (ersetzt tools.prices_eodhd,
+  Token: $EODHD_API_TOKEN oder tools.eod_fetch.TOKEN_PATHS)
+"""
+
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from tools.price_cache import get_cache
+
+START_DATE = "2015-01-01"
+
+
+def get_prices(
+    ticker: str,
+    prices: Optional[Dict[str, pd.DataFrame]] = None,
+    resync: bool = False,
+) -> Optional[pd.DataFrame]:
+    """DAILY prices (adjusted) – aus dem geteilten Dict oder über den Cache geladen."""
+    if prices is not None and ticker in prices:
+        return prices[ticker]
+
+    df = get_cache().get_prices(
+        ticker,
+        start=START_DATE,
+        adjusted=True,
+        resync=resync,
+    )
+
+    if prices is not None:
+        prices[ticker] = df
+    return df
+
+
+def load_prices(tickers: Iterable[str], resync: bool = False) -> Dict[str, pd.DataFrame]:
+    """Lädt jeden (eindeutigen) Ticker genau einmal – parallel, inkrementell."""
+    return get_cache().get_many(tickers, start=START_DATE, adjusted=True, resync=resync)
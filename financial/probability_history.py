@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Financial Probability History (append-only)
+-------------------------------------------
+• Records (as_of, key, freq, p_up, n_samples) als feste Binär-Records
+• Eine Partition je Monat: data/history/p_up_<YYYY-MM>.bin
+• Key / Freq als Integer-IDs (dims.json, nur anhängen)
+• Partition sortiert nach as_of → range() per binärer Suche
+• latest.json: letzter Record je (key, freq) → latest() ohne Scan
+• Gleicher Tag mehrfach gerechnet → der zuletzt angehängte Record gilt
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+HISTORY_DIR = Path(__file__).resolve().parent / "data" / "history"
+
+RECORD = np.dtype([
+    ("as_of", "<i4"),    # Tage seit 1970-01-01
+    ("key", "<i4"),
+    ("freq", "<i2"),
+    ("n_samples", "<i4"),
+    ("p_up", "<f8"),
+])
+
+COLUMNS = ["as_of", "key", "freq", "p_up", "n_samples"]
+
+
+def _day(d) -> int:
+    return int(np.datetime64(pd.Timestamp(d).date(), "D").astype(np.int64))
+
+
+def _month(day: int) -> str:
+    return str(np.datetime64(int(day), "D").astype("datetime64[M]"))
+
+
+def _atomic_json(path: Path, obj):
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp, path)
+
+
+class ProbabilityHistory:
+    """Append-only Store; ein Writer zur Zeit (Pipeline-Run)."""
+
+    def __init__(self, root: Path = HISTORY_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._dims_file = self.root / "dims.json"
+        self._latest_file = self.root / "latest.json"
+        self.dims = self._read_json(self._dims_file, {"keys": [], "freqs": []})
+        self._ids = {d: {v: i for i, v in enumerate(vals)} for d, vals in self.dims.items()}
+
+    @staticmethod
+    def _read_json(path: Path, default):
+        if not path.exists():
+            return default
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _id(self, dim: str, value: str) -> int:
+        ids = self._ids[dim]
+        if value not in ids:
+            ids[value] = len(self.dims[dim])
+            self.dims[dim].append(value)
+        return ids[value]
+
+    def partition(self, month: str) -> Path:
+        return self.root / f"p_up_{month}.bin"
+
+    def months(self) -> List[str]:
+        return sorted(p.stem[len("p_up_"):] for p in self.root.glob("p_up_*.bin"))
+
+    def _read(self, month: str) -> np.ndarray:
+        p = self.partition(month)
+        if not p.exists() or p.stat().st_size == 0:
+            return np.empty(0, dtype=RECORD)
+        return np.memmap(p, dtype=RECORD, mode="r")
+
+    # ── Write
+    def append(self, records: Iterable[dict]) -> int:
+        """Hängt Records an (dicts mit as_of, key, freq, p_up, n_samples)."""
+        rows = list(records)
+        if not rows:
+            return 0
+
+        arr = np.empty(len(rows), dtype=RECORD)
+        for i, r in enumerate(rows):
+            arr[i] = (_day(r["as_of"]), self._id("keys", r["key"]), self._id("freqs", r["freq"]),
+                      int(r["n_samples"]), float(r["p_up"]))
+        arr = arr[np.argsort(arr["as_of"], kind="stable")]
+
+        # IDs zuerst persistieren, damit jeder Record auflösbar bleibt
+        _atomic_json(self._dims_file, self.dims)
+
+        months = np.array([_month(d) for d in arr["as_of"]])
+        for month in dict.fromkeys(months):
+            chunk = arr[months == month]
+            existing = self._read(month)
+            if len(existing) and chunk["as_of"][0] < existing["as_of"][-1]:
+                # Backfill (selten): Partition sortiert neu schreiben
+                merged = np.concatenate([np.asarray(existing), chunk])
+                merged = merged[np.argsort(merged["as_of"], kind="stable")]
+                del existing
+                tmp = self.partition(month).with_suffix(".tmp")
+                merged.tofile(tmp)
+                os.replace(tmp, self.partition(month))
+            else:
+                del existing
+                with open(self.partition(month), "ab") as f:
+                    chunk.tofile(f)
+
+        self._update_latest(arr)
+        return len(arr)
+
+    def append_payloads(self, payloads: Dict[str, Dict[str, dict]]) -> int:
+        """Records aus den Pipeline-Payloads {asset: {freq: payload}}."""
+        records = [
+            {"as_of": payload["as_of"], "key": key, "freq": freq,
+             "p_up": entry["p_up"], "n_samples": entry["n_samples"]}
+            for by_freq in payloads.values()
+            for freq, payload in by_freq.items()
+            for key, entry in payload["indices"].items()
+        ]
+        return self.append(records)
+
+    def _update_latest(self, arr: np.ndarray):
+        latest = self._read_json(self._latest_file, {})
+        for r in arr:
+            k = f"{self.dims['keys'][r['key']]}|{self.dims['freqs'][r['freq']]}"
+            prev = latest.get(k)
+            if prev is None or int(r["as_of"]) >= prev[0]:
+                latest[k] = [int(r["as_of"]), float(r["p_up"]), int(r["n_samples"])]
+        _atomic_json(self._latest_file, latest)
+
+    # ── Read
+    def _frame(self, arr: np.ndarray) -> pd.DataFrame:
+        if len(arr) == 0:
+            return pd.DataFrame(columns=COLUMNS)
+        keys = np.asarray(self.dims["keys"], dtype=object)
+        freqs = np.asarray(self.dims["freqs"], dtype=object)
+        return pd.DataFrame({
+            "as_of": pd.to_datetime(np.asarray(arr["as_of"]).astype("datetime64[D]")),
+            "key": keys[arr["key"]],
+            "freq": freqs[arr["freq"]],
+            "p_up": np.asarray(arr["p_up"]),
+            "n_samples": np.asarray(arr["n_samples"]),
+        })
+
+    def range(
+        self,
+        start=None,
+        end=None,
+        keys: Optional[Iterable[str]] = None,
+        freqs: Optional[Iterable[str]] = None,
+        dedupe: bool = True,
+    ) -> pd.DataFrame:
+        """Alle Records mit start <= as_of <= end (Monats-Partitionen + binäre Suche)."""
+        d0 = _day(start) if start is not None else None
+        d1 = _day(end) if end is not None else None
+        m0 = _month(d0) if d0 is not None else None
+        m1 = _month(d1) if d1 is not None else None
+
+        parts = []
+        for month in self.months():
+            if (m0 and month < m0) or (m1 and month > m1):
+                continue
+            arr = self._read(month)
+            i0 = 0 if d0 is None else int(np.searchsorted(arr["as_of"], d0, side="left"))
+            i1 = len(arr) if d1 is None else int(np.searchsorted(arr["as_of"], d1, side="right"))
+            if i1 > i0:
+                parts.append(np.array(arr[i0:i1]))
+
+        arr = np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+        if keys is not None:
+            ids = [self._ids["keys"][k] for k in keys if k in self._ids["keys"]]
+            arr = arr[np.isin(arr["key"], ids)]
+        if freqs is not None:
+            ids = [self._ids["freqs"][f] for f in freqs if f in self._ids["freqs"]]
+            arr = arr[np.isin(arr["freq"], ids)]
+
+        df = self._frame(arr)
+        if dedupe and not df.empty:
+            df = df.drop_duplicates(["as_of", "key", "freq"], keep="last").reset_index(drop=True)
+        return df
+
+    def latest(self, keys: Optional[Iterable[str]] = None, freqs: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Letzter Record je (key, freq) aus dem latest-Index."""
+        latest = self._read_json(self._latest_file, {})
+        keys = None if keys is None else set(keys)
+        freqs = None if freqs is None else set(freqs)
+        rows = []
+        for k, (day, p_up, n) in latest.items():
+            key, freq = k.split("|", 1)
+            if (keys is None or key in keys) and (freqs is None or freq in freqs):
+                rows.append({"as_of": pd.Timestamp(np.datetime64(int(day), "D")), "key": key,
+                             "freq": freq, "p_up": p_up, "n_samples": n})
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def series(self, key: str, freq: str, start=None, end=None) -> pd.Series:
+        """p_up-Verlauf einer Serie (Index = as_of) – z.B. für Drift-Charts."""
+        df = self.range(start, end, keys=[key], freqs=[freq])
+        return pd.Series(df["p_up"].values, index=pd.DatetimeIndex(df["as_of"], name="as_of"), name=key)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Financial Risk Snapshot (consolidated, versioned)
+-------------------------------------------------
+• Eine Datei statt neun JSONs: data/financial_snapshot.npz
+• Spalten-Arrays: key, asset, region, label, p_up[N×F], n_samples[N×F]
+• F = Frequenzen (daily / weekly / monthly), fehlend = NaN / 0
+• __schema__ = Hash aus Version + Feldern + Frequenzen → Consumer prüfen
+  zuerst den Hash und lesen nur bei Übereinstimmung weiter
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+SNAPSHOT_FILE = Path(__file__).resolve().parent / "data" / "financial_snapshot.npz"
+
+SCHEMA_VERSION = 1
+FREQS = ("daily", "weekly", "monthly")
+FIELDS = (
+    ("key", "str"),
+    ("asset", "str"),
+    ("region", "str"),
+    ("label", "str"),
+    ("p_up", "float64[n,f]"),
+    ("n_samples", "int32[n,f]"),
+)
+
+
+def schema_hash(version: int = SCHEMA_VERSION, freqs=FREQS, fields=FIELDS) -> str:
+    spec = json.dumps({"version": version, "freqs": list(freqs), "fields": [list(f) for f in fields]})
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()[:16]
+
+
+SCHEMA_HASH = schema_hash()
+
+
+def write_snapshot(payloads: Dict[str, Dict[str, dict]], path: Path = SNAPSHOT_FILE) -> Path:
+    """Baut den Snapshot aus den Pipeline-Payloads {asset: {freq: payload}}."""
+    rows = {}
+    as_of = ""
+    for asset, by_freq in payloads.items():
+        for freq, payload in by_freq.items():
+            as_of = max(as_of, payload.get("as_of", ""))
+            for key, entry in payload["indices"].items():
+                rows.setdefault(key, {"asset": asset, "entry": entry, "freqs": {}})
+                rows[key]["freqs"][freq] = entry
+
+    keys = list(rows)
+    n, f = len(keys), len(FREQS)
+    p_up = np.full((n, f), np.nan, dtype=np.float64)
+    n_samples = np.zeros((n, f), dtype=np.int32)
+    for i, key in enumerate(keys):
+        for j, freq in enumerate(FREQS):
+            e = rows[key]["freqs"].get(freq)
+            if e is not None:
+                p_up[i, j] = e["p_up"]
+                n_samples[i, j] = e["n_samples"]
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fh:
+        np.savez(
+            fh,
+            __schema__=np.array(SCHEMA_HASH),
+            __version__=np.array(SCHEMA_VERSION, dtype=np.int32),
+            as_of=np.array(as_of),
+            freqs=np.array(FREQS),
+            key=np.array(keys, dtype=str),
+            asset=np.array([rows[k]["asset"] for k in keys], dtype=str),
+            region=np.array([rows[k]["entry"].get("region", "") for k in keys], dtype=str),
+            label=np.array([rows[k]["entry"].get("label", k) for k in keys], dtype=str),
+            p_up=p_up,
+            n_samples=n_samples,
+        )
+    os.replace(tmp, path)
+    print(f"✔ financial snapshot written: {path}")
+    return path
+
+
+def load_snapshot(path: Path = SNAPSHOT_FILE) -> Optional[dict]:
+    """
+    Liest den Snapshot in einem Zug. None, wenn die Datei fehlt;
+    ValueError bei abweichendem Schema-Hash.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    with np.load(path, allow_pickle=False) as z:
+        found = str(z["__schema__"]) if "__schema__" in z.files else None
+        if found != SCHEMA_HASH:
+            raise ValueError(f"financial snapshot schema mismatch: {found} != {SCHEMA_HASH}")
+        return {k: z[k] for k in z.files}
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+# -*- coding: utf-8 -*-
+"""
+Additional Series Configuration
+-------------------------------
+Zusätzliche Financial-Serien für die Registry (financial/series_registry.py).
+INDICES / CREDIT / VIX bleiben die Single Source of Truth ihrer Asset-Klassen;
+hier kommen neue Serien rein – nur Daten, kein Code.
+
+Felder:
+• asset     : Output-Gruppe → financial/data/<asset>_probabilities_<freq>.json
+• label     : Anzeigename
+• region    : Region
+• tickers   : Liste der Roh-Ticker (Reihenfolge = Operanden)
+• transform : "identity" | "ratio" | "spread" | "neg_log" | "basket"
+              oder {"op": "basket", "weights": {ticker: w, ...}}
+
+Beispiel:
+    "usa_small_vs_large": {
+        "asset": "equity",
+        "label": "USA – Russell 2000 vs S&P 500",
+        "region": "USA",
+        "tickers": ["RUT.INDX", "GSPC.INDX"],
+        "transform": "ratio",
+    },
+"""
+
+SERIES = {}
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Financial Series Registry
+-------------------------
+• Eine Liste deklarativer Serien aus INDICES / CREDIT / VIX / SERIES
+• Jede Serie: Roh-Ticker + Transform (identity, ratio, spread, neg_log, basket)
+• required_tickers() liefert jeden Roh-Ticker genau einmal
+• apply_transform() baut aus den Closes die Markov-Input-Serie
+"""
+
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from financial.indices_config import INDICES
+from financial.credit_config import CREDIT
+from financial.vix_config import VIX
+from financial.series_config import SERIES
+
+
+# ------------------------------------------------------------
+# TRANSFORMS  (closes: DataFrame, Spalten = spec["tickers"], ohne NaN)
+# ------------------------------------------------------------
+def _identity(closes: pd.DataFrame, params: dict) -> pd.Series:
+    return closes.iloc[:, 0]
+
+
+def _ratio(closes: pd.DataFrame, params: dict) -> pd.Series:
+    return closes.iloc[:, 0] / closes.iloc[:, 1]
+
+
+def _spread(closes: pd.DataFrame, params: dict) -> pd.Series:
+    # log(A) - log(B), z.B. HY vs IG
+    return np.log(closes.iloc[:, 0]) - np.log(closes.iloc[:, 1])
+
+
+def _neg_log(closes: pd.DataFrame, params: dict) -> pd.Series:
+    # Risk-On Semantik, z.B. vix_inv = -log(VIX)
+    return -np.log(closes.iloc[:, 0])
+
+
+def _basket(closes: pd.DataFrame, params: dict) -> pd.Series:
+    # geometrischer Korb, rebased auf 100 (Gewichte normiert, Default gleichgewichtet)
+    weights = params.get("weights") or {tk: 1.0 for tk in closes.columns}
+    w = pd.Series(weights, dtype=float).reindex(closes.columns).fillna(0.0)
+    w = w / w.sum()
+    log_rel = np.log(closes / closes.iloc[0])
+    return 100.0 * np.exp(log_rel.mul(w, axis=1).sum(axis=1))
+
+
+TRANSFORMS: Dict[str, Callable[[pd.DataFrame, dict], pd.Series]] = {
+    "identity": _identity,
+    "ratio": _ratio,
+    "spread": _spread,
+    "neg_log": _neg_log,
+    "basket": _basket,
+}
+
+ARITY = {"identity": 1, "neg_log": 1, "ratio": 2, "spread": 2}
+
+
+def _transform_spec(transform) -> dict:
+    spec = {"op": transform} if isinstance(transform, str) else dict(transform or {"op": "identity"})
+    if spec.get("op") not in TRANSFORMS:
+        raise ValueError(f"unknown transform: {spec.get('op')}")
+    return spec
+
+
+def apply_transform(closes: pd.DataFrame, transform: dict) -> pd.Series:
+    return TRANSFORMS[transform["op"]](closes, transform)
+
+
+# ------------------------------------------------------------
+# REGISTRY
+# ------------------------------------------------------------
+def _entry(key: str, asset: str, cfg: dict, tickers: List[str], transform, display: dict) -> dict:
+    spec = _transform_spec(transform)
+    n = ARITY.get(spec["op"])
+    if n is not None and len(tickers) != n:
+        raise ValueError(f"{key}: transform {spec['op']} needs {n} ticker(s), got {len(tickers)}")
+    return {
+        "key": key,
+        "asset": asset,
+        "label": cfg["label"],
+        "region": cfg["region"],
+        "tickers": list(tickers),
+        "transform": spec,
+        "display": display,
+    }
+
+
+def _display(tickers: List[str]) -> dict:
+    if len(tickers) == 1:
+        return {"ticker": tickers[0]}
+    return {"tickers": "-".join(tickers)}
+
+
+def build_registry() -> List[dict]:
+    """Alle Serien in Config-Reihenfolge (equity → credit → vix → SERIES)."""
+    reg = []
+    for key, cfg in INDICES.items():
+        tickers = [cfg["ticker"]]
+        reg.append(_entry(key, "equity", cfg, tickers, cfg.get("transform", "identity"), _display(tickers)))
+
+    for key, cfg in CREDIT.items():
+        tickers = [cfg["tickers"]["hy"], cfg["tickers"]["ig"]]
+        reg.append(_entry(key, "credit", cfg, tickers, cfg.get("transform", "spread"), _display(tickers)))
+
+    for key, cfg in VIX.items():
+        tickers = [cfg["ticker"]]
+        reg.append(_entry(key, "vix", cfg, tickers, cfg.get("transform", "neg_log"), _display(tickers)))
+
+    for key, cfg in SERIES.items():
+        tickers = list(cfg["tickers"])
+        reg.append(_entry(key, cfg["asset"], cfg, tickers, cfg.get("transform", "identity"), _display(tickers)))
+
+    keys = [e["key"] for e in reg]
+    dupes = sorted({k for k in keys if keys.count(k) > 1})
+    if dupes:
+        raise ValueError(f"duplicate series keys: {dupes}")
+    return reg
+
+
+def required_tickers(registry: List[dict]) -> List[str]:
+    """Jeder Roh-Ticker genau einmal (Reihenfolge wie in der Registry)."""
+    return list(dict.fromkeys(tk for e in registry for tk in e["tickers"]))
+
+
+def assets(registry: List[dict]) -> List[str]:
+    return list(dict.fromkeys(e["asset"] for e in registry))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Update ALL Financial Probabilities (equity / credit / vix × d / w / m)
+---------------------------------------------------------------------
+• Jeder Ticker wird genau EINMAL geladen (geteilter Price-Dict)
+• Registry-driven (financial/series_registry.py): alle Serien in einem Batch
+• Schreibt alle 9 Snapshot-Files nach financial/data/
+• --resync: volle Preis-Historie neu laden (Corporate Actions)
+• Meta-Markov Overall-Regime aus denselben Preisen (core/build_overall_regime.py)
+"""
+
+# ------------------------------------------------------------
+# PATH PATCH – find Markov root
+# ------------------------------------------------------------
+import sys
+from pathlib import Path
+
+def find_markov_root(start: Path) -> Path:
+    for p in [start] + list(start.parents):
+        if p.name == "Markov":
+            return p
+    raise RuntimeError("❌ Markov root directory not found")
+
+MARKOV_ROOT = find_markov_root(Path(__file__).resolve())
+if str(MARKOV_ROOT) not in sys.path:
+    sys.path.insert(0, str(MARKOV_ROOT))
+
+# ------------------------------------------------------------
+# IMPORTS
+# ------------------------------------------------------------
+from financial.series_registry import build_registry, required_tickers
+from financial.price_loader import load_prices
+from financial.financial_pipeline import run_financial_pipeline
+from core.build_overall_regime import build_overall_regime
+from tools.markov_profile import stage
+
+
+# ------------------------------------------------------------
+# CORE
+# ------------------------------------------------------------
+def all_tickers() -> list:
+    """Alle Roh-Ticker der Registry (ohne Duplikate)."""
+    return required_tickers(build_registry())
+
+
+def update_financial_all(resync: bool = False):
+    tickers = all_tickers()
+    print(f"📥 Loading {len(tickers)} tickers (once) …")
+
+    with stage("financial.fetch_all") as st:
+        prices = load_prices(tickers, resync=resync)
+        st.rows = sum(len(df) for df in prices.values() if df is not None)
+
+    run_financial_pipeline(prices=prices)
+
+    with stage("financial.overall_regime"):
+        build_overall_regime(prices=prices)
+
+    print("\n🏁 Financial probabilities updated.")
+
+
+# ------------------------------------------------------------
+# RUNNER
+# ------------------------------------------------------------
+if __name__ == "__main__":
+    update_financial_all(resync="--resync" in sys.argv)
@@ -7,6 +7,18 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+"""
+Global team_states.csv
+----------------------
+• Input : data/<league>/team_states.csv (LEAGUES)
+• Output: data/team_states.csv (+ `league` as last column)
+• --pwin: additionally rebuild league-local + pooled pwin_states.csv
+          (pwin_states.build_pwin_all, --hier for league → pool shrinkage);
+          update_sports_all.py publishes them on every run anyway
+"""
+
+import sys
+
 import pandas as pd
 from pathlib import Path
 
@@ -16,24 +28,34 @@ DATA_ROOT = ROOT / "data"
 LEAGUES = ["epl", "laliga", "seriea", "ligue1"]
 OUT_FILE = DATA_ROOT / "team_states.csv"
 
-dfs = []
 
-for lg in LEAGUES:
-    file = DATA_ROOT / lg / "team_states.csv"
-    if not file.exists():
-        print(f"⚠️ missing {file}")
-        continue
+def build_global_team_states(leagues=LEAGUES) -> pd.DataFrame:
+    dfs = []
+
+    for lg in leagues:
+        file = DATA_ROOT / lg / "team_states.csv"
+        if not file.exists():
+            print(f"⚠️ missing {file}")
+            continue
+
+        df = pd.read_csv(file)
+        df["league"] = lg   # optional, nur für Debug
+        dfs.append(df)
+
+    if not dfs:
+        raise RuntimeError("No team_states found")
 
-    df = pd.read_csv(file)
-    df["league"] = lg   # optional, nur für Debug
-    dfs.append(df)
+    out = pd.concat(dfs, ignore_index=True)
+    out.to_csv(OUT_FILE, index=False)
 
-if not dfs:
-    raise RuntimeError("No team_states found")
+    print(f"✔ global team_states.csv written ({len(out)} rows)")
+    print(out.state.value_counts())
+    return out
 
-out = pd.concat(dfs, ignore_index=True)
-out.to_csv(OUT_FILE, index=False)
 
-print(f"✔ global team_states.csv written ({len(out)} rows)")
-print(out.state.value_counts())
+if __name__ == "__main__":
+    build_global_team_states()
 
+    if "--pwin" in sys.argv:
+        from pwin_states import build_pwin_all
+        build_pwin_all(LEAGUES, hierarchical="--hier" in sys.argv)
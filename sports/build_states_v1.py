@@ -18,9 +18,12 @@ Build team_states.csv from team_matches.csv (league-aware)
 ----------------------------------------------------------
 • State = (relative_form, is_home)
 • relative_form ∈ {-1, 0, +1}
+• state_code = (relative_form + 1) * 2 + is_home  (int8, 0..5)
 • Output: data/<league>/team_states.csv
 """
 
+import time
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import sys
@@ -36,16 +39,86 @@ LOOKBACK = 3
 LEAGUES = ["epl", "laliga", "seriea", "ligue1",]   
 
 # ─────────────────────────────────────────────
-# HELPERS
+# STATES
 # ─────────────────────────────────────────────
+# state_code = (rel_form + 1) * 2 + is_home  →  0..5
+# the "(rel_form,is_home)" label is only looked up for the CSV,
+# downstream (pwin_states, previews, app) still keys on it
+STATE_LABELS = np.array([f"({rf},{h})" for rf in (-1, 0, 1) for h in (0, 1)])
 
-def compute_form(wins):
+OUT_COLS = ["date", "season", "team", "opponent", "is_home", "form", "opp_form",
+            "rel_form", "state", "state_code", "win", "draw"]
+
+
+def state_code(rel_form, is_home):
+    return ((np.asarray(rel_form) + 1) * 2 + np.asarray(is_home)).astype(np.int8)
+
+
+def lagged_form(team_codes: np.ndarray, wins: np.ndarray, lookback: int = LOOKBACK):
+    """
+    Rows sorted by (team, date).
+    Binary form before each match: 1 = >=2 wins in the previous `lookback`
+    matches of that team, -1 = fewer than `lookback` previous matches.
+    Lagged rolling sum via one cumsum: sum(w[i-L..i-1]) = c[i] - c[i-L].
+    """
+    n = len(wins)
+    c = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(wins, out=c[1:])
+
+    # position within the team block
+    i = np.arange(n)
+    start = np.ones(n, dtype=bool)
+    start[1:] = team_codes[1:] != team_codes[:-1]
+    pos = i - np.maximum.accumulate(np.where(start, i, 0))
+
+    prior = c[i] - c[np.maximum(i - lookback, 0)]
+    form = (prior >= 2).astype(np.int8)
+    form[pos < lookback] = -1
+    return form
+
+
+def compute_states(df: pd.DataFrame, lookback: int = LOOKBACK) -> pd.DataFrame:
     """
-    Binary form:
-    1 = >=2 wins in last LOOKBACK matches
-    0 = otherwise
+    team_matches → team_states, columnar.
+    Opponent form is joined on integer keys (day * n_teams + team_code).
     """
-    return int(sum(wins[-LOOKBACK:]) >= 2) if len(wins) >= LOOKBACK else None
+    teams = pd.Categorical(np.concatenate([
+        df["team"].to_numpy(dtype=object), df["opponent"].to_numpy(dtype=object),
+    ]))
+    n = len(df)
+    team = teams.codes[:n].astype(np.int64)
+    opp = teams.codes[n:].astype(np.int64)
+    day = df["date"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+    # (team, date) order – categories are sorted, so this equals the string sort
+    order = np.lexsort((day, team))
+    df = df.take(order).reset_index(drop=True)
+    team, opp, day = team[order], opp[order], day[order]
+
+    form = lagged_form(team, df["win"].to_numpy(dtype=np.int8), lookback)
+
+    # opponent form: lookup of (day, opponent) in the (day, team) key table
+    n_teams = max(len(teams.categories), 1)
+    key = day * n_teams + team
+    okey = day * n_teams + opp
+    k_sort = np.argsort(key, kind="stable")
+    j = k_sort[np.minimum(np.searchsorted(key, okey, sorter=k_sort), max(n - 1, 0))] if n else k_sort
+    opp_form = np.where(key[j] == okey, form[j], -1).astype(np.int8)
+
+    keep = (form >= 0) & (opp_form >= 0)
+    out = df.loc[keep, ["date", "season", "team", "opponent", "is_home", "win", "draw"]].copy()
+    is_home = out["is_home"].to_numpy(dtype=np.int8)
+    rel = (form[keep] - opp_form[keep]).astype(np.int8)
+
+    out["form"] = form[keep]
+    out["opp_form"] = opp_form[keep]
+    out["rel_form"] = rel
+    out["state_code"] = state_code(rel, is_home)
+    out["state"] = STATE_LABELS[out["state_code"].to_numpy()]
+    out["is_home"] = is_home
+    out["win"] = out["win"].astype(np.int8)
+    out["draw"] = out["draw"].astype(np.int8)
+    return out[OUT_COLS].reset_index(drop=True)
 
 
 # ─────────────────────────────────────────────
@@ -65,60 +138,16 @@ def build_states(league: str):
         return
 
     df = pd.read_csv(in_file, parse_dates=["date"])
-    df = df.sort_values(["team", "date"])
-
-    # 1) Form pro Team berechnen
-    forms = []
-    for team, g in df.groupby("team"):
-        wins = []
-        for _, r in g.iterrows():
-            f = compute_form(wins)
-            wins.append(r.win)
-            forms.append({
-                "date": r.date,
-                "team": team,
-                "form": f
-            })
-
-    fdf = pd.DataFrame(forms)
-
-    # 2) Eigene Form mergen
-    df = df.merge(fdf, on=["date", "team"], how="left")
-
-    # 3) Gegner-Form mergen (self join)
-    df = df.merge(
-        fdf.rename(columns={"team": "opponent", "form": "opp_form"}),
-        on=["date", "opponent"],
-        how="left"
-    )
-
-    rows = []
-    for _, r in df.iterrows():
-        if pd.isna(r.form) or pd.isna(r.opp_form):
-            continue
 
-        rel_form = int(r.form - r.opp_form)  # {-1,0,+1}
-        state = f"({rel_form},{int(r.is_home)})"
-
-        rows.append({
-            "date": r.date,
-            "season": r.season,
-            "team": r.team,
-            "opponent": r.opponent,
-            "is_home": int(r.is_home),
-            "form": int(r.form),
-            "opp_form": int(r.opp_form),
-            "rel_form": rel_form,
-            "state": state,
-            "win": int(r.win),
-            "draw": int(r.draw),
-        })
-
-    out = pd.DataFrame(rows).sort_values(["team", "date"])
+    t0 = time.perf_counter()
+    out = compute_states(df)
+    dt = time.perf_counter() - t0
+
     out.to_csv(out_file, index=False)
 
-    print(f"✔ team_states.csv written ({len(out)} rows)")
+    print(f"✔ team_states.csv written ({len(out)} rows, {dt * 1e3:.0f} ms)")
     print(out.state.value_counts())
+    return out
 
 
 # ─────────────────────────────────────────────
@@ -12,8 +12,11 @@ Build team-level match table from raw_matches.csv
 -------------------------------------------------
 • Input : data/<league>/raw_matches.csv
 • Output: data/<league>/team_matches.csv
+• All leagues in one vectorized pass (no iterrows)
 """
 
+import time
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import sys
@@ -48,54 +51,105 @@ LEAGUES = {
 # CORE
 # ─────────────────────────────────────────────
 
-def build_team_table(league_key: str):
+TEAM_COLS = ["date", "season", "team", "opponent", "is_home", "win", "draw"]
 
-    data_dir = DATA_ROOT / league_key
-    in_file  = data_dir / "raw_matches.csv"
-    out_file = data_dir / "team_matches.csv"
 
-    print(f"\n🧱 Building team_matches: {league_key.upper()}")
+def load_raw_matches(leagues=None) -> pd.DataFrame:
+    """
+    raw_matches.csv of all (or the given) leagues in one frame
+    with a categorical `league` column.
+    """
+    leagues = list(LEAGUES) if leagues is None else list(leagues)
+    frames = []
+    for lg in leagues:
+        in_file = DATA_ROOT / lg / "raw_matches.csv"
+        if not in_file.exists():
+            print(f"⚠️ Missing raw_matches.csv for {lg}")
+            continue
+        df = pd.read_csv(
+            in_file,
+            usecols=["date", "season", "home_team", "away_team", "home_goals", "away_goals"],
+            parse_dates=["date"],
+        )
+        df["league"] = lg
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=["league", "date", "season", "home_team", "away_team",
+                                     "home_goals", "away_goals"])
+
+    raw = pd.concat(frames, ignore_index=True)
+    raw["league"] = pd.Categorical(raw["league"], categories=leagues)
+    return raw
+
+
+def team_rows(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Home/away reshaping straight from column arrays:
+    one match row → a home row and an away row (first n = home, last n = away).
+    team/opponent share one sorted categorical, flags are int8.
+    """
+    n = len(raw)
+    hg = raw["home_goals"].to_numpy()
+    ag = raw["away_goals"].to_numpy()
+
+    teams = pd.Categorical(np.concatenate([
+        raw["home_team"].to_numpy(dtype=object),
+        raw["away_team"].to_numpy(dtype=object),
+    ]))
+    codes = teams.codes
+    opp_codes = np.concatenate([codes[n:], codes[:n]])
+    draw = (hg == ag).astype(np.int8)
+
+    out = {
+        "date": np.tile(raw["date"].to_numpy(), 2),
+        "season": np.tile(raw["season"].to_numpy(), 2),
+        "team": pd.Categorical.from_codes(codes, dtype=teams.dtype),
+        "opponent": pd.Categorical.from_codes(opp_codes, dtype=teams.dtype),
+        "is_home": np.repeat(np.array([1, 0], dtype=np.int8), n),
+        "win": np.concatenate([hg > ag, ag > hg]).astype(np.int8),
+        "draw": np.concatenate([draw, draw]),
+    }
+    if "league" in raw:
+        league = pd.Categorical(raw["league"])
+        out = {"league": pd.Categorical.from_codes(np.tile(league.codes, 2), dtype=league.dtype), **out}
+
+    df = pd.DataFrame(out)
+
+    # sort by (league, team, date) on integer codes – categories are sorted,
+    # so this equals the old string sort
+    keys = [df["date"].to_numpy(), df["team"].cat.codes.to_numpy()]
+    if "league" in df:
+        keys.append(df["league"].cat.codes.to_numpy())
+    order = np.lexsort(keys)
+    return df.take(order).reset_index(drop=True)
+
+
+def build_team_tables(leagues=None, write: bool = True) -> pd.DataFrame:
+    """
+    team_matches for every configured league in one call.
+    Returns the combined table (with `league`); writes data/<league>/team_matches.csv.
+    """
+    t0 = time.perf_counter()
+    raw = load_raw_matches(leagues)
+    out = team_rows(raw)
+    dt = time.perf_counter() - t0
+
+    if write:
+        for lg, g in out.groupby("league", observed=True, sort=False):
+            out_file = DATA_ROOT / lg / "team_matches.csv"
+            g[TEAM_COLS].to_csv(out_file, index=False)
+            print(f"✔ {lg:8s} team_matches.csv written ({len(g)} rows) → {out_file}")
+
+    print(f"🧱 team_matches: {len(raw)} matches → {len(out)} team rows "
+          f"({out['league'].nunique() if len(out) else 0} leagues, {dt * 1e3:.0f} ms)")
+    return out
+
 
-    if not in_file.exists():
-        print(f"⚠️ Missing raw_matches.csv for {league_key}")
-        return
-
-    df = pd.read_csv(in_file, parse_dates=["date"])
-
-    rows = []
-
-    for _, r in df.iterrows():
-        # home team
-        rows.append({
-            "date": r.date,
-            "season": r.season,
-            "team": r.home_team,
-            "opponent": r.away_team,
-            "is_home": 1,
-            "win": int(r.home_goals > r.away_goals),
-            "draw": int(r.home_goals == r.away_goals),
-        })
-
-        # away team
-        rows.append({
-            "date": r.date,
-            "season": r.season,
-            "team": r.away_team,
-            "opponent": r.home_team,
-            "is_home": 0,
-            "win": int(r.away_goals > r.home_goals),
-            "draw": int(r.home_goals == r.away_goals),
-        })
-
-    out = (
-        pd.DataFrame(rows)
-        .sort_values(["team", "date"])
-        .reset_index(drop=True)
-    )
-
-    out.to_csv(out_file, index=False)
-    print(f"✔ team_matches.csv written ({len(out)} rows)")
-    print(f"📁 {out_file}")
+def build_team_table(league_key: str):
+    """Single league (kept for existing callers)."""
+    print(f"\n🧱 Building team_matches: {league_key.upper()}")
+    return build_team_tables([league_key])
 
 
 # ─────────────────────────────────────────────
@@ -108,13 +162,15 @@ def main():
     if len(sys.argv) > 1:
         leagues = [sys.argv[1]]
     else:
-        leagues = LEAGUES.keys()
+        leagues = list(LEAGUES)
 
-    for lg in leagues:
-        if lg not in LEAGUES:
-            print(f"❌ Unknown league: {lg}")
-            continue
-        build_team_table(lg)
+    unknown = [lg for lg in leagues if lg not in LEAGUES]
+    for lg in unknown:
+        print(f"❌ Unknown league: {lg}")
+
+    leagues = [lg for lg in leagues if lg in LEAGUES]
+    if leagues:
+        build_team_tables(leagues)
 
     print("\n🏁 Done.")
 
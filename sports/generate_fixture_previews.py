@@ -71,6 +71,40 @@ def load_pwin_map(data_dir: Path) -> dict:
     return df.set_index("state")[["p_win", "p_draw", "samples"]].to_dict("index")
 
 
+def preview_rows(last_wins: dict, pwin_map: dict, as_of) -> list[dict]:
+    """
+    {team: last wins} → preview rows (one per team and venue).
+    Shared with the incremental pipeline (update_sports_all.py).
+    """
+    previews = []
+
+    for team in sorted(last_wins):
+        form = compute_form(last_wins[team])
+
+        if form is None:
+            continue
+
+        for is_home in (1, 0):
+            state = f"({form},{is_home})"
+            state_probs = pwin_map.get(state)
+
+            if state_probs is None:
+                continue
+
+            previews.append({
+                "team": team,
+                "form": form,
+                "is_home": is_home,
+                "state": state,
+                "p_win": round(float(state_probs["p_win"]), 3),
+                "p_draw": round(float(state_probs["p_draw"]), 3),
+                "samples": int(state_probs["samples"]),
+                "as_of": str(pd.Timestamp(as_of).date()),
+            })
+
+    return previews
+
+
 # ─────────────────────────────────────────────
 # CORE
 # ─────────────────────────────────────────────
@@ -94,34 +128,9 @@ def generate_previews(league_key: str):
 
     # ✅ LEAGUE-LOCAL pwin map
     pwin_map = load_pwin_map(data_dir)
-    previews = []
-
-    for team, g in df.groupby("team"):
-        g = g[g.date <= last_date]
-
-        last_wins = g.win.tolist()[-LOOKBACK:]
-        form = compute_form(last_wins)
-
-        if form is None:
-            continue
-
-        for is_home in (1, 0):
-            state = f"({form},{is_home})"
-            state_probs = pwin_map.get(state)
 
-            if state_probs is None:
-                continue
-
-            previews.append({
-                "team": team,
-                "form": form,
-                "is_home": is_home,
-                "state": state,
-                "p_win": round(float(state_probs["p_win"]), 3),
-                "p_draw": round(float(state_probs["p_draw"]), 3),
-                "samples": int(state_probs["samples"]),
-                "as_of": str(last_date.date()),
-            })
+    last_wins = {team: g.win.tolist()[-LOOKBACK:] for team, g in df.groupby("team")}
+    previews = preview_rows(last_wins, pwin_map, last_date)
 
     if not previews:
         print("⚠️ No previews generated.")
@@ -8,10 +8,14 @@
 # -*- coding: utf-8 -*-
 
 """
-Build pwin_states.csv per league
---------------------------------
+Build pwin_states.csv for all leagues in one pass
+-------------------------------------------------
 • Input : data/<league>/team_states.csv
-• Output: data/<league>/pwin_states.csv
+• Output: data/<league>/pwin_states.csv   (league-local)
+          data/pwin_states.csv            (pooled over all leagues)
+• One groupby over (league, state), shrinkage as array math
+• --hier: league estimates shrink toward the pooled estimate
+          instead of 0.5 (hierarchical shrinkage)
 """
 
 import sys
@@ -28,15 +32,18 @@ DATA_ROOT = ROOT / "data"
 
 MIN_SAMPLES = 30
 SHRINK_K = 20   # shrink strength towards 0.5
+POOL_K = 20     # hierarchical: shrink strength league → pool
+
+GLOBAL_PWIN = DATA_ROOT / "pwin_states.csv"
 
 
 # ─────────────────────────────────────────────
 # HELPERS
 # ─────────────────────────────────────────────
 
-def shrink(p: float, n: int, k: int = SHRINK_K) -> float:
-    """Empirical Bayes shrinkage towards 0.5"""
-    return (p * n + 0.5 * k) / (n + k)
+def shrink(p, n, k: int = SHRINK_K, prior=0.5):
+    """Empirical Bayes shrinkage towards `prior` (scalars or arrays)"""
+    return (p * n + prior * k) / (n + k)
 
 
 def discover_leagues() -> list[str]:
@@ -53,34 +60,38 @@ def discover_leagues() -> list[str]:
 
 
 # ─────────────────────────────────────────────
-# CORE
+# ENGINE
 # ─────────────────────────────────────────────
 
-def build_pwin_states(league: str):
+def load_team_states(leagues: list[str]) -> pd.DataFrame:
+    """team_states.csv of all leagues, with a categorical `league` column."""
+    frames = []
+    for lg in leagues:
+        in_file = DATA_ROOT / lg / "team_states.csv"
+        if not in_file.exists():
+            print(f"⚠️ Missing {in_file}")
+            continue
 
-    data_dir = DATA_ROOT / league
-    in_file  = data_dir / "team_states.csv"
-    out_file = data_dir / "pwin_states.csv"
+        df = pd.read_csv(in_file)
+        missing = {"state", "win", "draw"} - set(df.columns)
+        if missing:
+            raise RuntimeError(f"{in_file} missing columns: {sorted(missing)}")
 
-    print(f"\n🧮 Building pwin_states: {league.upper()}")
+        df.insert(0, "league", lg)
+        frames.append(df)
 
-    if not in_file.exists():
-        print(f"⚠️ Missing {in_file}")
-        return
+    if not frames:
+        return pd.DataFrame(columns=["league", "state", "win", "draw"])
 
-    df = pd.read_csv(in_file)
-
-    if df.empty:
-        print("⚠️ team_states.csv is empty")
-        return
+    out = pd.concat(frames, ignore_index=True)
+    out["league"] = pd.Categorical(out["league"], categories=leagues)
+    return out
 
-    required = {"state", "win", "draw"}
-    missing = required - set(df.columns)
-    if missing:
-        raise RuntimeError(f"{in_file} missing columns: {sorted(missing)}")
 
-    grp = (
-        df.groupby("state")
+def state_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """One pass: samples / wins / draws per (league, state)."""
+    return (
+        df.groupby(["league", "state"], observed=True)
           .agg(
               samples=("win", "count"),
               wins=("win", "sum"),
@@ -89,28 +100,117 @@ def build_pwin_states(league: str):
           .reset_index()
     )
 
+
+def pwin_table(grp: pd.DataFrame, prior_win=0.5, prior_draw=None, k: int = SHRINK_K,
+               n_gate=None) -> pd.DataFrame:
+    """
+    Counts per state (state, samples, wins, draws) → pwin table.
+    prior_win / prior_draw: scalar or array aligned with grp
+    (prior_draw None → raw draw rate, as before).
+    n_gate: samples used for the MIN_SAMPLES gate (default: own samples).
+    """
+    grp = grp.copy()
+    n = grp["samples"].to_numpy(dtype=float)
+    gate = (n if n_gate is None else np.asarray(n_gate, dtype=float)) >= MIN_SAMPLES
+
     grp["p_win_raw"]  = grp["wins"] / grp["samples"]
     grp["p_draw_raw"] = grp["draws"] / grp["samples"]
 
     # Use NaN (not None) for numeric columns
-    grp["p_win"] = np.where(
-        grp["samples"] >= MIN_SAMPLES,
-        grp.apply(lambda r: shrink(float(r["p_win_raw"]), int(r["samples"])), axis=1),
-        np.nan
-    )
+    p_win = shrink(grp["p_win_raw"].to_numpy(dtype=float), n, k, prior_win)
+    p_draw = grp["p_draw_raw"].to_numpy(dtype=float)
+    if prior_draw is not None:
+        p_draw = shrink(p_draw, n, k, prior_draw)
 
-    grp["p_draw"] = np.where(
-        grp["samples"] >= MIN_SAMPLES,
-        grp["p_draw_raw"].astype(float),
-        np.nan
-    )
+    grp["p_win"] = np.where(gate, p_win, np.nan)
+    grp["p_draw"] = np.where(gate, p_draw, np.nan)
 
     # Confidence: if p_win NaN, treat as neutral 0.5 (so confidence -> 0)
     grp["confidence"] = grp["samples"] * (grp["p_win"].fillna(0.5) - 0.5).abs()
 
-    grp = grp.sort_values("samples", ascending=False)
+    return grp.sort_values("samples", ascending=False)
+
+
+def pwin_tables(counts: pd.DataFrame, hierarchical: bool = False):
+    """
+    (league, state) counts → ({league: table}, pooled table).
+    Pooled = all leagues summed, shrunk toward 0.5.
+    hierarchical: league p_win / p_draw shrink toward the pooled estimate
+    with POOL_K; the sample gate then uses the pooled samples.
+    """
+    pool_counts = counts.groupby("state")[["samples", "wins", "draws"]].sum().reset_index()
+    pooled = pwin_table(pool_counts)
+
+    league_counts = counts
+    prior_win, prior_draw, k, n_gate = 0.5, None, SHRINK_K, None
+    if hierarchical and len(counts):
+        pool = pool_counts.set_index("state")
+        p_pool = shrink(pool["wins"] / pool["samples"], pool["samples"])
+        d_pool = pool["draws"] / pool["samples"]
+
+        s = counts["state"]
+        prior_win = s.map(p_pool).to_numpy(dtype=float)
+        prior_draw = s.map(d_pool).to_numpy(dtype=float)
+        n_gate = s.map(pool["samples"]).to_numpy(dtype=float)
+        k = POOL_K
+        league_counts = counts.assign(p_win_pool=prior_win)
+
+    # all leagues in one array pass, split afterwards
+    table = pwin_table(league_counts, prior_win, prior_draw, k, n_gate)
+    tables = {
+        str(lg): g.drop(columns="league").sort_values("samples", ascending=False)
+        for lg, g in table.sort_index().groupby("league", observed=True, sort=False)
+    }
+    return tables, pooled
+
+
+def write_pwin_tables(tables: dict, pooled: pd.DataFrame):
+    for lg, grp in tables.items():
+        out_file = DATA_ROOT / lg / "pwin_states.csv"
+        out_file.parent.mkdir(parents=True, exist_ok=True)
+        grp.to_csv(out_file, index=False)
+        print(f"✔ {out_file} ({len(grp)} states)")
+
+    GLOBAL_PWIN.parent.mkdir(parents=True, exist_ok=True)
+    pooled.to_csv(GLOBAL_PWIN, index=False)
+    print(f"✔ {GLOBAL_PWIN} ({len(pooled)} states, pooled)")
+
+
+# ─────────────────────────────────────────────
+# CORE
+# ─────────────────────────────────────────────
+
+def build_pwin_all(leagues=None, hierarchical: bool = False):
+    """All leagues in one pass: league-local + pooled tables."""
+    leagues = discover_leagues() if leagues is None else list(leagues)
+
+    print(f"\n🧮 Building pwin_states: {', '.join(lg.upper() for lg in leagues)}"
+          f"{' (hierarchical)' if hierarchical else ''}")
+
+    df = load_team_states(leagues)
+    if df.empty:
+        print("⚠️ team_states.csv is empty")
+        return {}, pd.DataFrame()
+
+    tables, pooled = pwin_tables(state_counts(df), hierarchical)
+    write_pwin_tables(tables, pooled)
+
+    print(pooled[["state", "samples", "p_win", "p_draw", "confidence"]].head(12))
+    return tables, pooled
+
+
+def build_pwin_states(league: str):
+    """Single league, league-local only (kept for existing callers)."""
+    df = load_team_states([league])
+    if df.empty:
+        return
+
+    tables, _ = pwin_tables(state_counts(df))
+    grp = tables.get(league)
+    if grp is None:
+        return
 
-    out_file.parent.mkdir(parents=True, exist_ok=True)
+    out_file = DATA_ROOT / league / "pwin_states.csv"
     grp.to_csv(out_file, index=False)
 
     print(f"✔ {out_file} ({len(grp)} states)")
@@ -123,25 +223,26 @@ def build_pwin_states(league: str):
 
 def main():
     # CLI:
-    # python3 pwin_states.py epl
-    # python3 pwin_states.py laliga
-    # python3 pwin_states.py seriea
+    # python3 pwin_states.py              # all leagues + pooled
+    # python3 pwin_states.py --hier       # league → pool shrinkage
+    # python3 pwin_states.py epl          # single league only
 
-    if len(sys.argv) > 1:
-        leagues = [sys.argv[1].strip().lower()]
-    else:
-        leagues = discover_leagues()
+    args = [a.strip().lower() for a in sys.argv[1:] if not a.startswith("--")]
 
+    if args:
+        build_pwin_states(args[0])
+        print("\n🏁 Done.")
+        return
+
+    leagues = discover_leagues()
     if not leagues:
         print("⚠️ No leagues found (expected data/<league>/team_states.csv).")
         return
 
-    for lg in leagues:
-        build_pwin_states(lg)
+    build_pwin_all(leagues, hierarchical="--hier" in sys.argv)
 
     print("\n🏁 Done.")
 
 
 if __name__ == "__main__":
     main()
-
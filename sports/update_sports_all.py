@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sports pipeline (full or incremental)
+-------------------------------------
+download_matches → build_team_matches → build_states_v1 → pwin_states
+→ generate_fixture_previews
+
+• --full       : rebuild everything from raw_matches.csv, write checkpoint
+• default      : incremental – only matches of raw_matches.csv that are not
+                 in the checkpoint yet are applied
+• Checkpoint   : data/<league>/pipeline_checkpoint.json
+                 (last LOOKBACK wins per team, win/draw counters per state,
+                 processed matches on the last date)
+• pwin tables (league-local + pooled, pwin_states.pwin_tables) and
+  previews are always published from the checkpoints of all leagues
+• --hier       : hierarchical shrinkage league → pool
+• Incremental rows are appended to team_matches.csv / team_states.csv in
+  match order; --full re-sorts by (team, date).
+
+Usage:
+    python sports/update_sports_all.py                  # download + incremental
+    python sports/update_sports_all.py --no-download    # incremental on existing raw files
+    python sports/update_sports_all.py --full [laliga]
+    python sports/update_sports_all.py --hier           # league → pool shrinkage
+"""
+
+import sys
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# PATH BOOTSTRAP
+# ─────────────────────────────────────────────
+ROOT = Path(__file__).resolve().parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from build_team_matches import LEAGUES, TEAM_COLS, build_team_tables
+from build_states_v1 import LOOKBACK, OUT_COLS, STATE_LABELS, build_states, state_code
+from pwin_states import pwin_tables, write_pwin_tables
+from generate_fixture_previews import preview_rows
+
+DATA_ROOT = ROOT / "data"
+CHECKPOINT = "pipeline_checkpoint.json"
+CHECKPOINT_VERSION = 1
+
+
+# ─────────────────────────────────────────────
+# CHECKPOINT
+# ─────────────────────────────────────────────
+
+def _match_key(r) -> str:
+    return f"{r.home_team}|{r.away_team}"
+
+
+def _form(wins: list):
+    """Same rule as build_states_v1: >=2 wins in the last LOOKBACK matches."""
+    return int(sum(wins[-LOOKBACK:]) >= 2) if len(wins) >= LOOKBACK else None
+
+
+def load_checkpoint(league: str):
+    file = DATA_ROOT / league / CHECKPOINT
+    if not file.exists():
+        return None
+    cp = json.loads(file.read_text())
+    return cp if cp.get("version") == CHECKPOINT_VERSION else None
+
+
+def save_checkpoint(league: str, cp: dict):
+    file = DATA_ROOT / league / CHECKPOINT
+    tmp = file.with_suffix(".tmp")
+    tmp.write_text(json.dumps(cp, indent=1))
+    tmp.replace(file)
+
+
+def checkpoint_from_tables(raw: pd.DataFrame, team_matches: pd.DataFrame, states: pd.DataFrame) -> dict:
+    """Checkpoint after a full rebuild (tables of one league)."""
+    last_date = raw["date"].max()
+    on_last = raw[raw["date"] == last_date]
+
+    tm = team_matches.sort_values(["team", "date"])
+    teams = {
+        str(team): [int(w) for w in g.to_numpy()[-LOOKBACK:]]
+        for team, g in tm.groupby("team", observed=True)["win"]
+    }
+
+    counts = states.groupby("state")[["win", "draw"]].agg(["count", "sum"])
+    counters = {
+        str(s): [int(r[("win", "count")]), int(r[("win", "sum")]), int(r[("draw", "sum")])]
+        for s, r in counts.iterrows()
+    }
+
+    return {
+        "version": CHECKPOINT_VERSION,
+        "lookback": LOOKBACK,
+        "n_matches": int(len(raw)),
+        "last_date": str(last_date.date()) if len(raw) else None,
+        "last_keys": sorted(_match_key(r) for r in on_last.itertuples()),
+        "teams": teams,
+        "counters": counters,
+    }
+
+
+# ─────────────────────────────────────────────
+# OUTPUTS FROM CHECKPOINTS
+# ─────────────────────────────────────────────
+
+def checkpoint_counts(cps: dict) -> pd.DataFrame:
+    """{league: checkpoint} → (league, state, samples, wins, draws)."""
+    rows = [(lg, s, *c) for lg, cp in cps.items() for s, c in sorted(cp["counters"].items())]
+    return pd.DataFrame(rows, columns=["league", "state", "samples", "wins", "draws"])
+
+
+def publish(cps: dict, hierarchical: bool = False):
+    """
+    pwin_states.csv (league-local + pooled) and fixture_previews.json from the
+    checkpoints – O(leagues · (teams + states)), independent of history length.
+    """
+    tables, pooled = pwin_tables(checkpoint_counts(cps), hierarchical)
+    write_pwin_tables(tables, pooled)
+
+    for lg, cp in cps.items():
+        pwin = tables.get(lg)
+        if pwin is None:
+            continue
+        pwin_map = pwin.set_index("state")[["p_win", "p_draw", "samples"]].to_dict("index")
+        previews = preview_rows(cp["teams"], pwin_map, cp["last_date"])
+        if previews:
+            (DATA_ROOT / lg / "fixture_previews.json").write_text(json.dumps(previews, indent=2))
+            print(f"🔮 {lg:8s} fixture_previews.json ({len(previews)} rows)")
+
+
+# ─────────────────────────────────────────────
+# FULL / INCREMENTAL
+# ─────────────────────────────────────────────
+
+def _read_raw(league: str) -> pd.DataFrame:
+    return pd.read_csv(DATA_ROOT / league / "raw_matches.csv", parse_dates=["date"])
+
+
+def run_full(leagues: list[str]):
+    print("\n🔁 Full rebuild")
+    build_team_tables(leagues)
+
+    for lg in leagues:
+        data_dir = DATA_ROOT / lg
+        if not (data_dir / "raw_matches.csv").exists():
+            continue
+        states = build_states(lg)
+
+        raw = _read_raw(lg)
+        tm = pd.read_csv(data_dir / "team_matches.csv", parse_dates=["date"])
+        save_checkpoint(lg, checkpoint_from_tables(raw, tm, states))
+        print(f"💾 checkpoint {lg} ({len(raw)} matches)")
+
+
+def new_matches(raw: pd.DataFrame, cp: dict):
+    """
+    Rows of raw_matches.csv not yet in the checkpoint (None → full rebuild needed).
+    raw is sorted by date; new = later date, or the last date but unseen.
+    """
+    if cp["last_date"] is None:
+        return raw if cp["n_matches"] == 0 else None
+
+    last = pd.Timestamp(cp["last_date"])
+    seen = set(cp["last_keys"])
+    keys = raw["home_team"].astype(str) + "|" + raw["away_team"].astype(str)
+
+    old = (raw["date"] < last) | ((raw["date"] == last) & keys.isin(seen))
+    if int(old.sum()) != cp["n_matches"]:
+        # history changed (corrected score, removed match, …)
+        return None
+    return raw[~old]
+
+
+def apply_matches(cp: dict, new: pd.DataFrame):
+    """Apply new matches in date order → (team_matches rows, team_states rows)."""
+    teams, counters = cp["teams"], cp["counters"]
+    tm_rows, st_rows = [], []
+
+    for r in new.sort_values("date", kind="stable").itertuples(index=False):
+        h, a = str(r.home_team), str(r.away_team)
+        wh = teams.setdefault(h, [])
+        wa = teams.setdefault(a, [])
+        fh, fa = _form(wh), _form(wa)
+        draw = int(r.home_goals == r.away_goals)
+
+        for team, opp, is_home, win, f, of in (
+            (h, a, 1, int(r.home_goals > r.away_goals), fh, fa),
+            (a, h, 0, int(r.away_goals > r.home_goals), fa, fh),
+        ):
+            tm_rows.append((r.date, r.season, team, opp, is_home, win, draw))
+            if f is None or of is None:
+                continue
+            rel = f - of
+            code = int(state_code(rel, is_home))
+            state = str(STATE_LABELS[code])
+            st_rows.append((r.date, r.season, team, opp, is_home, f, of, rel, state, code, win, draw))
+
+            c = counters.setdefault(state, [0, 0, 0])
+            c[0] += 1
+            c[1] += win
+            c[2] += draw
+
+        # update after both forms were taken (form = before the match)
+        teams[h] = (wh + [int(r.home_goals > r.away_goals)])[-LOOKBACK:]
+        teams[a] = (wa + [int(r.away_goals > r.home_goals)])[-LOOKBACK:]
+
+    last = new["date"].max()
+    if cp["last_date"] is None or last > pd.Timestamp(cp["last_date"]):
+        cp["last_date"] = str(last.date())
+        cp["last_keys"] = []
+    cp["last_keys"] = sorted(set(cp["last_keys"]) | {
+        _match_key(r) for r in new[new["date"] == pd.Timestamp(cp["last_date"])].itertuples()
+    })
+    cp["n_matches"] += len(new)
+
+    return (
+        pd.DataFrame(tm_rows, columns=TEAM_COLS),
+        pd.DataFrame(st_rows, columns=OUT_COLS),
+    )
+
+
+def _append_csv(df: pd.DataFrame, file: Path):
+    if df.empty:
+        return
+    df.to_csv(file, mode="a", header=not file.exists(), index=False, date_format="%Y-%m-%d")
+
+
+def run_incremental(league: str) -> bool:
+    """False → no usable checkpoint / history changed (caller rebuilds)."""
+    data_dir = DATA_ROOT / league
+    cp = load_checkpoint(league)
+    if cp is None or cp.get("lookback") != LOOKBACK:
+        print(f"⚠️ {league}: no checkpoint → full rebuild")
+        return False
+
+    raw = _read_raw(league)
+    new = new_matches(raw, cp)
+    if new is None:
+        print(f"⚠️ {league}: raw_matches.csv changed before checkpoint → full rebuild")
+        return False
+
+    print(f"\n⚡ {league.upper()}: {len(new)} new matches")
+    if new.empty:
+        return True
+
+    t0 = time.perf_counter()
+    tm_new, st_new = apply_matches(cp, new)
+    _append_csv(tm_new, data_dir / "team_matches.csv")
+    _append_csv(st_new, data_dir / "team_states.csv")
+    save_checkpoint(league, cp)
+    dt = time.perf_counter() - t0
+
+    print(f"✔ +{len(tm_new)} team rows, +{len(st_new)} states ({dt * 1e3:.0f} ms)")
+    return True
+
+
+# ─────────────────────────────────────────────
+# MAIN
+# ─────────────────────────────────────────────
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    full = "--full" in sys.argv
+    leagues = [a.lower() for a in args] or list(LEAGUES)
+
+    unknown = [lg for lg in leagues if lg not in LEAGUES]
+    for lg in unknown:
+        print(f"❌ Unknown league: {lg}")
+    leagues = [lg for lg in leagues if lg in LEAGUES]
+
+    if "--no-download" not in sys.argv:
+        from download_matches import LEAGUES as DL_LEAGUES, fetch_league
+        for lg in leagues:
+            fetch_league(lg, DL_LEAGUES[lg])
+
+    if full:
+        run_full(leagues)
+    else:
+        rebuild = [lg for lg in leagues
+                   if (DATA_ROOT / lg / "raw_matches.csv").exists() and not run_incremental(lg)]
+        if rebuild:
+            run_full(rebuild)
+
+    # pool over every league with a checkpoint, not only the updated ones
+    cps = {lg: cp for lg in LEAGUES if (cp := load_checkpoint(lg)) is not None}
+    if cps:
+        publish(cps, hierarchical="--hier" in sys.argv)
+
+    print("\n🏁 Done.")
+
+
+if __name__ == "__main__":
+    main()
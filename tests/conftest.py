@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Lokaler Stub für die EOD-API (/api/eod/<ticker>) – tools/eod_fetch.py
+# und tools/price_cache.py laufen über EODClient(base_url=stub.url).
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+class StubEOD:
+    """Bars je Ticker, geplante 5xx-Antworten, Request-Log."""
+
+    def __init__(self):
+        self.bars = {}        # ticker → [{"date": "YYYY-MM-DD", "close": …, …}]
+        self.fail = {}        # ticker → Anzahl 503-Antworten vor dem Erfolg
+        self.delay = 0.0      # Sekunden je Antwort
+        self.log = []         # (monotonic, ticker, query)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.url = None
+
+    def requests_for(self, ticker):
+        return [q for _, tk, q in self.log if tk == ticker]
+
+    def handle(self, h: BaseHTTPRequestHandler):
+        u = urlparse(h.path)
+        ticker = u.path.rsplit("/", 1)[-1]
+        q = {k: v[0] for k, v in parse_qs(u.query).items()}
+        with self._lock:
+            self.log.append((time.monotonic(), ticker, q))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = self.fail.get(ticker, 0)
+            if fail:
+                self.fail[ticker] = fail - 1
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            if fail:
+                h.send_response(503)
+                h.send_header("Content-Length", "0")
+                h.end_headers()
+                return
+            rows = [
+                b for b in self.bars.get(ticker, [])
+                if b["date"] >= q.get("from", "") and ("to" not in q or b["date"] <= q["to"])
+            ]
+            body = json.dumps(rows).encode("utf-8")
+            h.send_response(200)
+            h.send_header("Content-Type", "application/json")
+            h.send_header("Content-Length", str(len(body)))
+            h.end_headers()
+            h.wfile.write(body)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def eod_stub():
+    stub = StubEOD()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            stub.handle(self)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.url = f"http://127.0.0.1:{server.server_address[1]}/api"
+    stub.server = server
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+def bars(dates, close=100.0, factor=1.0):
+    """API-Bars mit close = adjusted_close / factor."""
+    return [
+        {"date": d, "open": close + i, "high": close + i, "low": close + i,
+         "close": close + i, "adjusted_close": (close + i) * factor, "volume": 1000}
+        for i, d in enumerate(dates)
+    ]
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+import core.build_highlow_monitor as monitor
+from core.build_highlow_monitor import latest_regime_breadth, update_highlow
+from tools.breadth import BreadthState, breadth_history, regime_breadth
+from tools.markov_core_v4 import panel_trend_matrix
+
+WINDOW = 60
+
+
+def _panel(T=300, W=12, seed=0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2020-01-01", periods=T)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (T, W)), axis=0))
+    c[:80, 0] = np.nan          # späterer Listing-Start
+    c[150, 3] = np.nan          # Lücke
+    return pd.DataFrame(c, index=idx, columns=[f"T{i}" for i in range(W)])
+
+
+def _split(panel, ticker="T5", at=200, ratio=4.0):
+    """Unadjusted 4:1-Split: Kurs fällt ab `at` auf ein Viertel."""
+    out = panel.copy()
+    out.loc[out.index[at]:, ticker] /= ratio
+    return out
+
+
+def test_incremental_equals_batch_over_split_series():
+    panel = _split(_panel())
+    state = BreadthState.from_panel(panel.iloc[:WINDOW + 20], WINDOW)
+    rows = [state.update(d, r) for d, r in panel.iloc[WINDOW + 20:].iterrows()]
+    inc = pd.DataFrame(rows).set_index("date")
+
+    batch = breadth_history(panel, WINDOW).loc[inc.index]
+    for col in ("high_share", "low_share", "n_highs", "n_lows", "n_eligible"):
+        np.testing.assert_allclose(inc[col].to_numpy(float), batch[col].to_numpy(float))
+
+
+def test_restated_history_triggers_rebuild(tmp_path):
+    kw = dict(window=WINDOW, state_path=tmp_path / "s.npz", history_path=str(tmp_path / "h.csv"))
+    raw = _split(_panel(), at=250)
+
+    update_highlow(raw.iloc[:280], **kw)
+
+    # Adjusted-Provider restatet die Historie vor dem Split (Faktor 1/4)
+    adjusted = raw.copy()
+    adjusted.loc[:adjusted.index[249], "T5"] /= 4.0
+
+    inc = update_highlow(adjusted, **kw)
+    batch = breadth_history(adjusted, WINDOW)
+    pd.testing.assert_frame_equal(
+        inc.astype(float), batch.astype(float), check_freq=False, check_names=False, atol=1e-6
+    )
+
+
+def test_adjusted_history_stays_incremental(tmp_path, monkeypatch):
+    kw = dict(window=WINDOW, state_path=tmp_path / "s.npz", history_path=str(tmp_path / "h.csv"))
+    panel = _panel()
+    update_highlow(panel.iloc[:280], **kw)
+
+    # Dividende T5 (Historie × 0.98) und 2:1-Split T3 ab dem neuen Bar:
+    # der Provider skaliert die ganze bisherige Historie je Ticker
+    adjusted = panel.iloc[:285].copy()
+    adjusted.loc[:adjusted.index[279], "T5"] *= 0.98
+    adjusted["T3"] /= 2.0
+
+    def no_rebuild(*args, **kwargs):
+        raise AssertionError("full rebuild")
+
+    monkeypatch.setattr(monitor, "breadth_history", no_rebuild)
+    inc = update_highlow(adjusted, **kw)
+    monkeypatch.undo()
+
+    batch = breadth_history(adjusted, WINDOW)
+    pd.testing.assert_frame_equal(
+        inc.astype(float), batch.astype(float), check_freq=False, check_names=False, atol=1e-6
+    )
+    state = BreadthState.load(tmp_path / "s.npz")
+    np.testing.assert_allclose(state.closes, adjusted.iloc[-WINDOW:].to_numpy())
+
+
+def test_latest_regime_breadth_matches_trend_matrix():
+    panel = _panel(T=900, W=20, seed=3)
+    tm = panel_trend_matrix(panel)
+    assert latest_regime_breadth(panel) == regime_breadth(tm["p_up_week"], tm["Threshold"])
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from conftest import bars
+from tools.eod_fetch import EODClient
+
+
+def _client(stub, **kw):
+    kw.setdefault("rate_per_sec", 0)
+    return EODClient(base_url=stub.url, api_token="test", **kw)
+
+
+def test_fetch_aligned_concurrent(eod_stub):
+    eod_stub.bars = {
+        "AAA": bars(["2024-01-02", "2024-01-03", "2024-01-04"]),
+        "BBB": bars(["2024-01-03", "2024-01-04", "2024-01-05"], close=50.0),
+        "CCC": bars(["2024-01-02", "2024-01-05"], close=10.0, factor=0.5),
+    }
+    eod_stub.delay = 0.2
+
+    with _client(eod_stub, max_workers=3) as c:
+        panel = c.fetch_aligned(["AAA", "BBB", "CCC", "AAA"], "2024-01-01")
+
+    assert eod_stub.max_in_flight >= 2
+    assert len(eod_stub.log) == 3                      # Duplikat nur einmal geladen
+    assert list(panel.columns) == ["AAA", "BBB", "CCC"]
+    assert list(panel.index) == list(pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]))
+    assert np.isnan(panel.loc["2024-01-02", "BBB"]) and np.isnan(panel.loc["2024-01-05", "AAA"])
+    assert panel.loc["2024-01-04", "BBB"] == 51.0
+    assert panel.loc["2024-01-05", "CCC"] == 11.0 * 0.5   # adjusted_close
+
+
+def test_retry_with_backoff_on_5xx(eod_stub):
+    eod_stub.bars = {"AAA": bars(["2024-01-02", "2024-01-03"])}
+    eod_stub.fail = {"AAA": 2}
+
+    with _client(eod_stub, retries=3, backoff=0.1) as c:
+        df = c.fetch_prices("AAA", "2024-01-01")
+
+    assert len(df) == 2
+    t = [ts for ts, tk, _ in eod_stub.log if tk == "AAA"]
+    assert len(t) == 3
+    assert t[2] - t[1] >= 0.15                          # Backoff wächst (0.1 · 2)
+
+
+def test_failed_ticker_after_retries_is_empty(eod_stub):
+    eod_stub.bars = {"AAA": bars(["2024-01-02"]), "BBB": bars(["2024-01-02"])}
+    eod_stub.fail = {"BBB": 10}
+
+    with _client(eod_stub, retries=1, backoff=0.0) as c:
+        out = c.fetch_many(["AAA", "BBB"], "2024-01-01")
+
+    assert len(out["AAA"]) == 1 and out["BBB"].empty
+    assert len(eod_stub.requests_for("BBB")) == 2
+
+
+def test_rate_limit_per_host(eod_stub):
+    eod_stub.bars = {f"T{i}": bars(["2024-01-02"]) for i in range(15)}
+
+    with _client(eod_stub, max_workers=8, rate_per_sec=10) as c:
+        t0 = time.monotonic()
+        c.fetch_many(list(eod_stub.bars), "2024-01-01")
+        dt = time.monotonic() - t0
+
+        # Burst 10, danach 10/s → 5 weitere brauchen ≥ 0.5 s
+        assert dt >= 0.45
+        ts = sorted(t for t, _, _ in eod_stub.log)
+        assert sum(t - ts[0] < 0.3 for t in ts) <= 13
+
+        # anderer Host hat einen eigenen Bucket
+        t1 = time.monotonic()
+        c.limiter.acquire("other.example:443")
+        assert time.monotonic() - t1 < 0.05
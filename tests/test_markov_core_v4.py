@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+from tools.markov_core_v4 import (
+    clear_cache, compute_returns_horizon, panel_tail, panel_trend_matrix, preprocess_prices,
+    rolling_p_up_last,
+)
+
+
+def _raw(n=80):
+    idx = pd.bdate_range("2020-01-01", periods=n)
+    return pd.DataFrame({"Close": 100 + np.cumsum(np.sin(np.arange(n)))}, index=idx)
+
+
+def test_cache_hit_shares_read_only_buffers():
+    clear_cache()
+    raw = _raw()
+    a, b = preprocess_prices(raw), preprocess_prices(raw)
+    assert np.shares_memory(a["Close"].to_numpy(), b["Close"].to_numpy())
+    assert all(not blk.values.flags.writeable for blk in a._mgr.blocks)
+
+
+def test_caller_mutation_does_not_reach_cache():
+    clear_cache()
+    df = preprocess_prices(_raw())
+    r = compute_returns_horizon(df, 5).copy()
+    first = float(r.iloc[0, 0])
+    r.iloc[0, 0] = -1.0
+    r["extra"] = 1
+    again = compute_returns_horizon(df, 5)
+    assert float(again.iloc[0, 0]) == first
+    assert "extra" not in again.columns
+
+
+def test_panel_tail_keeps_last_bars_per_ticker():
+    rng = np.random.default_rng(1)
+    idx = pd.bdate_range("2010-01-01", periods=1500)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (1500, 6)), axis=0))
+    c[:1200, 0] = np.nan                        # kurze Historie
+    c[rng.random(c.shape) < 0.02] = np.nan      # Lücken
+    c[:, 1] = np.nan                            # nie gehandelt
+    panel = pd.DataFrame(c, index=idx, columns=[f"T{i}" for i in range(6)])
+
+    tail = panel_tail(panel, 756)
+    n_full, n_tail = panel.notna().sum(), tail.notna().sum()
+    assert (n_tail >= np.minimum(n_full, 756)).all() and len(tail) < len(panel)
+
+    tm = panel_trend_matrix(panel)
+    for tk in ("T0", "T3"):
+        ref = rolling_p_up_last(panel[[tk]].rename(columns={tk: "Close"}), "weekly", 5)
+        assert tm.loc[tk, "p_up_week"] == ref
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from conftest import bars
+from tools.eod_fetch import EODClient
+from tools.price_cache import PriceCache
+
+DATES = ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+
+
+def _cache(stub, tmp_path, url=None):
+    client = EODClient(base_url=url or stub.url, api_token="test", rate_per_sec=0, retries=0)
+    return PriceCache(root=tmp_path, client=client)
+
+
+def test_delta_fetch_appends_one_row(eod_stub, tmp_path):
+    eod_stub.bars = {"AAA": bars(DATES)}
+    cache = _cache(eod_stub, tmp_path)
+    assert len(cache.update("AAA", "2024-01-01")) == 4
+
+    eod_stub.bars = {"AAA": bars(DATES + ["2024-01-08"])}
+    df = cache.update("AAA", "2024-01-01")
+
+    first, second = eod_stub.requests_for("AAA")
+    assert first["from"] == "2024-01-01"
+    assert second["from"] == "2024-01-05"               # last_cached_date
+    assert len(df) == 5 and df["date"].is_unique
+    assert df["date"].iloc[-1].strftime("%Y-%m-%d") == "2024-01-08"
+    assert len(cache.load("AAA")) == 5
+
+
+def test_resync_when_adjusted_close_changes_on_overlap(eod_stub, tmp_path):
+    eod_stub.bars = {"AAA": bars(DATES)}
+    cache = _cache(eod_stub, tmp_path)
+    cache.update("AAA", "2024-01-01")
+
+    # Dividende: ganze Historie neu adjustiert + ein neuer Bar
+    eod_stub.bars = {"AAA": bars(DATES + ["2024-01-08"], factor=0.98)}
+    df = cache.update("AAA", "2024-01-01")
+
+    froms = [q["from"] for q in eod_stub.requests_for("AAA")]
+    assert froms == ["2024-01-01", "2024-01-05", "2024-01-01"]
+    assert len(df) == 5
+    np.testing.assert_allclose(df["adjusted_close"], df["close"] * 0.98)
+    np.testing.assert_allclose(cache.load("AAA")["adjusted_close"], df["adjusted_close"])
+
+
+def test_connection_error_falls_back_to_cache(eod_stub, tmp_path, capsys):
+    eod_stub.bars = {"AAA": bars(DATES)}
+    _cache(eod_stub, tmp_path).update("AAA", "2024-01-01")
+
+    port = eod_stub.server.server_address[1]
+    eod_stub.server.shutdown()
+    eod_stub.server.server_close()
+
+    df = _cache(eod_stub, tmp_path, url=f"http://127.0.0.1:{port}/api").update("AAA", "2024-01-01")
+    assert len(df) == 4
+    assert "using cache" in capsys.readouterr().out
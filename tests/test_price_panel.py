@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.price_panel import PricePanel, open_panel
+
+
+def _panel(T, W, v=1.0):
+    idx = pd.bdate_range("2020-01-01", periods=T)
+    return pd.DataFrame(np.full((T, W), v), index=idx, columns=[f"T{i}" for i in range(W)])
+
+
+def test_rewrite_with_new_shape_swaps_manifest(tmp_path):
+    PricePanel.write(_panel(50, 3), path=tmp_path, name="x")
+    p = PricePanel.write(_panel(60, 5, 2.0), path=tmp_path, name="x")
+    assert p.shape == (60, 5)
+
+    assert open_panel("missing", tmp_path) is None
+    q = open_panel("x", tmp_path)
+    assert q.shape == (60, 5) and (np.asarray(q.values) == 2.0).all()
+
+    # alte Version bleibt für laufende Reader, ältere werden aufgeräumt
+    PricePanel.write(_panel(70, 4), path=tmp_path, name="x")
+    assert len([d for d in tmp_path.glob("x.v*") if d.is_dir()]) == 2
+
+
+def test_manifest_shape_is_validated(tmp_path):
+    PricePanel.write(_panel(50, 3), path=tmp_path, name="x")
+    manifest = tmp_path / "x.panel.json"
+    meta = json.loads(manifest.read_text())
+    meta["shape"] = [51, 3]
+    manifest.write_text(json.dumps(meta))
+    with pytest.raises(ValueError):
+        open_panel("x", tmp_path)
+
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+from core.screener_nasdaq100 import FUSION, fusion_bias
+
+
+def _trend_matrix(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "p_up_daily": rng.uniform(0, 1, n),
+            "p_up_week": rng.uniform(0, 1, n),
+            "p_up_month": rng.uniform(0, 1, n),
+            # Optimizer-Thresholds liegen oft unter 0.5
+            "Threshold": rng.uniform(0.3, 0.7, n),
+        },
+        index=pd.Index([f"T{i}" for i in range(n)], name="Ticker"),
+    )
+
+
+def test_longs_and_shorts_are_disjoint():
+    tm = _trend_matrix()
+    for freq in FUSION:
+        res = fusion_bias(tm, freq, "2025-01-31")
+        assert res["double_longs"] and res["double_shorts"]
+        assert not set(res["double_longs"]) & set(res["double_shorts"])
+
+
+def test_threshold_half_tie_is_not_both():
+    tm = pd.DataFrame(
+        {"p_up_daily": [0.5], "p_up_week": [0.5], "p_up_month": [0.5], "Threshold": [0.5]},
+        index=pd.Index(["T0"], name="Ticker"),
+    )
+    res = fusion_bias(tm, "weekly", "2025-01-31")
+    assert res["double_longs"] == ["T0"]
+    assert res["double_shorts"] == []
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------
+#  MARKOV CORE v4 · Benchmark Suite
+#  - Synthetische GBM-Preis-Panels (1 … 5'000 Ticker, 1k … 50k Bars)
+#  - Misst calc_transitions, calc_transitions_horizon, rolling_p_up_last,
+#    default_threshold_func und create_rolling_trend_matrix
+#  - Report: Laufzeit, Durchsatz (Bars/s), Peak-Memory (tracemalloc)
+#  - Vergleich gegen gespeicherte Baseline-JSON → Regressionen = Exit 1
+#
+#  Usage:
+#    python tools/bench_markov_core_v4.py                 # Standard-Suite
+#    python tools/bench_markov_core_v4.py --quick         # kleine Größen
+#    python tools/bench_markov_core_v4.py --save-baseline # Baseline schreiben
+# ------------------------------------------------------------------
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tools import markov_core_v4 as mc
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+BASELINE_FILE = ROOT / "tools" / "bench_baseline_markov_core_v4.json"
+TOLERANCE = 0.25   # +25% gegenüber Baseline = Regression
+SEED = 42
+
+# Single-Series Funktionen: Anzahl Bars
+SERIES_BARS = [1_000, 10_000, 50_000]
+# Trend-Matrix: (Ticker, Bars)
+PANEL_SIZES = [(1, 1_000), (100, 2_500), (1_000, 2_500), (5_000, 1_000)]
+
+QUICK_SERIES_BARS = [1_000, 5_000]
+QUICK_PANEL_SIZES = [(1, 1_000), (100, 1_500)]
+
+
+# ------------------------------------------------------------------
+# Synthetic data (GBM)
+# ------------------------------------------------------------------
+def gbm_closes(
+    n_tickers: int,
+    n_bars: int,
+    seed: int = SEED,
+    mu: float = 0.05,
+    sigma: float = 0.20,
+) -> np.ndarray:
+    """GBM-Closes (Ticker × Bars), Start 100, Trading-Day-Skalierung."""
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / 252.0
+    shocks = rng.standard_normal((n_tickers, n_bars))
+    log_ret = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * shocks
+    return 100.0 * np.exp(np.cumsum(log_ret, axis=1))
+
+
+def synthetic_universe(n_tickers: int, n_bars: int, seed: int = SEED) -> Dict[str, pd.DataFrame]:
+    """{ticker: DataFrame(Close)} auf Business-Day-Index (wie tool_prices)."""
+    idx = pd.bdate_range(end="2025-12-31", periods=n_bars)
+    closes = gbm_closes(n_tickers, n_bars, seed=seed)
+    return {
+        f"SYN{i:05d}": pd.DataFrame({"Close": closes[i]}, index=idx)
+        for i in range(n_tickers)
+    }
+
+
+# ------------------------------------------------------------------
+# Measurement
+# ------------------------------------------------------------------
+def _time_best(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        mc.clear_cache()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _peak_mem(fn: Callable[[], object]) -> int:
+    mc.clear_cache()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return int(peak)
+
+
+def run_case(name: str, fn: Callable[[], object], bars: int, repeat: int) -> dict:
+    secs = _time_best(fn, repeat)
+    peak = _peak_mem(fn)
+    return {
+        "case": name,
+        "seconds": secs,
+        "bars": int(bars),
+        "bars_per_sec": bars / secs if secs > 0 else float("inf"),
+        "peak_mb": peak / 1e6,
+    }
+
+
+def build_cases(series_bars: List[int], panel_sizes: List[tuple]) -> List[tuple]:
+    """Liste aus (name, fn, bars) – Daten werden vorab erzeugt."""
+    cases = []
+
+    for n_bars in series_bars:
+        df = synthetic_universe(1, n_bars)["SYN00000"]
+        cases += [
+            (f"calc_transitions[{n_bars}]",
+             lambda df=df: mc.calc_transitions(df), n_bars),
+            (f"calc_transitions_horizon_5[{n_bars}]",
+             lambda df=df: mc.calc_transitions_horizon(df, horizon=5), n_bars),
+            (f"rolling_p_up_last_monthly[{n_bars}]",
+             lambda df=df: mc.rolling_p_up_last(df, "monthly", 21, return_n=True), n_bars),
+            (f"default_threshold_func[{n_bars}]",
+             lambda df=df: mc.default_threshold_func(df), n_bars),
+        ]
+
+    # Threshold wie in der Trend-Matrix (threshold_window=63)
+    thr_df = synthetic_universe(1, 63 + 3 + mc.AHEAD + 1)["SYN00000"]
+    cases.append((
+        f"default_threshold_func_window[{len(thr_df)}]",
+        lambda d=thr_df: mc.default_threshold_func(d), len(thr_df),
+    ))
+
+    for n_tickers, n_bars in panel_sizes:
+        dfs = synthetic_universe(n_tickers, n_bars)
+        cases.append((
+            f"create_rolling_trend_matrix[{n_tickers}x{n_bars}]",
+            lambda dfs=dfs: mc.create_rolling_trend_matrix(dfs),
+            n_tickers * n_bars,
+        ))
+
+    return cases
+
+
+# ------------------------------------------------------------------
+# Baseline
+# ------------------------------------------------------------------
+def load_baseline(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, results: List[dict]):
+    payload = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "results": {r["case"]: r for r in results},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"💾 Baseline written: {path}")
+
+
+def compare(results: List[dict], baseline: dict, tolerance: float = TOLERANCE) -> List[dict]:
+    """Markiert jede Messung mit ratio = t / t_baseline; Regression ab 1+tolerance."""
+    base = (baseline or {}).get("results", {})
+    regressions = []
+    for r in results:
+        b = base.get(r["case"])
+        if not b or not b.get("seconds"):
+            r["ratio"] = None
+            continue
+        r["ratio"] = r["seconds"] / b["seconds"]
+        if r["ratio"] > 1.0 + tolerance:
+            regressions.append(r)
+    return regressions
+
+
+# ------------------------------------------------------------------
+# Report
+# ------------------------------------------------------------------
+def print_report(results: List[dict]):
+    print(f"\n{'case':52s} {'time [ms]':>11s} {'Mbars/s':>9s} {'peak MB':>9s} {'vs base':>8s}")
+    print("-" * 93)
+    for r in results:
+        ratio = r.get("ratio")
+        rel = f"{ratio:7.2f}x" if ratio is not None else "      –"
+        print(
+            f"{r['case']:52s} {r['seconds'] * 1e3:11.2f} "
+            f"{r['bars_per_sec'] / 1e6:9.3f} {r['peak_mb']:9.2f} {rel:>8s}"
+        )
+
+
+# ------------------------------------------------------------------
+# MAIN
+# ------------------------------------------------------------------
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark markov_core_v4")
+    ap.add_argument("--quick", action="store_true", help="kleine Größen (Smoke-Run)")
+    ap.add_argument("--repeat", type=int, default=3, help="Wiederholungen je Case (best-of)")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE)
+    ap.add_argument("--json", type=Path, default=None, help="Ergebnisse zusätzlich als JSON")
+    args = ap.parse_args(argv)
+
+    series_bars = QUICK_SERIES_BARS if args.quick else SERIES_BARS
+    panel_sizes = QUICK_PANEL_SIZES if args.quick else PANEL_SIZES
+
+    print("⏱  Markov Core v4 – Benchmark")
+    results = [
+        run_case(name, fn, bars, args.repeat)
+        for name, fn, bars in build_cases(series_bars, panel_sizes)
+    ]
+
+    baseline = load_baseline(args.baseline)
+    regressions = compare(results, baseline, args.tolerance)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        return 0
+
+    if baseline is None:
+        print(f"\nℹ️  No baseline at {args.baseline} (use --save-baseline)")
+        return 0
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) > +{args.tolerance:.0%}:")
+        for r in regressions:
+            print(f"   {r['case']}: {r['ratio']:.2f}x")
+        return 1
+
+    print("\n✅ no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------
+#  BREADTH · Rolling High/Low über Constituents × Dates
+#  - Neues N-Tage-Hoch: Close_t >= max(Close_{t-N+1..t}) (Tief analog)
+#  - Eligible: alle N Closes im Fenster vorhanden
+#  - Batch: sliding_window_view über die Dates-Achse (ein NumPy-Pass)
+#  - Inkrementell: BreadthState hält nur die letzten N Zeilen →
+#    ein neuer Bar kostet O(N · Ticker)
+#  - Restatement (Adjusted Closes nach Split/Dividende): Faktor je Ticker
+#    im Überlappungs-Bar wie tools/price_cache.py → State reskalieren
+#    (High/Low-Flags sind skaleninvariant); nur Revisionen, die kein
+#    reiner Faktor sind, erzwingen einen Neuaufbau
+#  - Regime-Breadth: Anteil Ticker mit p_up über ihrem Threshold
+# ------------------------------------------------------------------
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+WINDOW = 252   # ~52 Wochen
+RESTATE_TOL = 1e-4   # rel. Abweichung nach Reskalierung (Rundung der Adjusted Closes)
+
+
+# ------------------------------------------------------------------
+# Batch
+# ------------------------------------------------------------------
+def rolling_extremes(closes: np.ndarray, window: int = WINDOW):
+    """
+    closes: Dates × Ticker (NaN = kein Bar).
+    Rückgabe: (is_high, is_low, eligible) – bool, Dates × Ticker;
+    die ersten window-1 Zeilen sind nie eligible.
+    """
+    c = np.asarray(closes, dtype=float)
+    T, W = c.shape
+    is_high = np.zeros((T, W), dtype=bool)
+    is_low = np.zeros((T, W), dtype=bool)
+    eligible = np.zeros((T, W), dtype=bool)
+    if T < window:
+        return is_high, is_low, eligible
+
+    # (T-window+1) × W × window – View, keine Kopie
+    win = sliding_window_view(c, window, axis=0)
+    last = c[window - 1:]
+    with np.errstate(invalid="ignore"):
+        ok = np.isfinite(win).all(axis=-1)
+        hi = win.max(axis=-1)
+        lo = win.min(axis=-1)
+        eligible[window - 1:] = ok
+        is_high[window - 1:] = ok & (last >= hi)
+        is_low[window - 1:] = ok & (last <= lo)
+    return is_high, is_low, eligible
+
+
+def _shares(is_high, is_low, eligible):
+    n = eligible.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hs = np.where(n > 0, is_high.sum(axis=-1) / n, np.nan)
+        ls = np.where(n > 0, is_low.sum(axis=-1) / n, np.nan)
+    return hs, ls, n
+
+
+def breadth_history(panel: pd.DataFrame, window: int = WINDOW) -> pd.DataFrame:
+    """High/Low-Shares je Datum für ein Close-Panel (Dates × Ticker)."""
+    is_high, is_low, eligible = rolling_extremes(panel.to_numpy(dtype=float), window)
+    hs, ls, n = _shares(is_high, is_low, eligible)
+    out = pd.DataFrame({
+        "high_share": hs,
+        "low_share": ls,
+        "n_highs": is_high.sum(axis=1),
+        "n_lows": is_low.sum(axis=1),
+        "n_eligible": n,
+    }, index=pd.DatetimeIndex(panel.index, name="date"))
+    return out[out["n_eligible"] > 0]
+
+
+def regime_breadth(p_up: pd.Series, threshold) -> float:
+    """Anteil Ticker mit p_up >= Threshold (Skalar oder Series je Ticker)."""
+    p = p_up.to_numpy(dtype=float)
+    if isinstance(threshold, pd.Series):
+        thr = threshold.reindex(p_up.index).to_numpy(dtype=float)
+    else:
+        thr = np.full_like(p, float(threshold))
+    ok = np.isfinite(p) & np.isfinite(thr)
+    if not ok.any():
+        return float("nan")
+    return float((p[ok] >= thr[ok]).mean())
+
+
+# ------------------------------------------------------------------
+# Inkrementell
+# ------------------------------------------------------------------
+class BreadthState:
+    """Die letzten `window` Zeilen des Panels – genug für den nächsten Bar."""
+
+    def __init__(self, closes: np.ndarray, dates: Iterable, tickers: Iterable[str], window: int = WINDOW):
+        self.window = int(window)
+        self.closes = np.asarray(closes, dtype=float)[-self.window:]
+        self.dates = pd.DatetimeIndex(dates)[-self.window:]
+        self.tickers = [str(t) for t in tickers]
+
+    @classmethod
+    def from_panel(cls, panel: pd.DataFrame, window: int = WINDOW) -> "BreadthState":
+        return cls(panel.to_numpy(dtype=float), panel.index, panel.columns, window)
+
+    @property
+    def last_date(self) -> Optional[pd.Timestamp]:
+        return self.dates[-1] if len(self.dates) else None
+
+    def update(self, date, row: pd.Series) -> dict:
+        """Neuer Bar (Series je Ticker) → Shares für dieses Datum."""
+        new = [t for t in row.index if t not in self.tickers]
+        if new:
+            # neue Constituents: Historie = NaN (erst nach N Bars eligible)
+            self.closes = np.hstack([self.closes, np.full((len(self.closes), len(new)), np.nan)])
+            self.tickers += [str(t) for t in new]
+
+        x = row.reindex(self.tickers).to_numpy(dtype=float)
+        self.closes = np.vstack([self.closes, x[None, :]])[-self.window:]
+        self.dates = self.dates.append(pd.DatetimeIndex([pd.Timestamp(date)]))[-self.window:]
+
+        if len(self.closes) < self.window:
+            return {"date": pd.Timestamp(date), "high_share": float("nan"), "low_share": float("nan"),
+                    "n_highs": 0, "n_lows": 0, "n_eligible": 0}
+
+        with np.errstate(invalid="ignore"):
+            ok = np.isfinite(self.closes).all(axis=0)
+            is_high = ok & (x >= self.closes.max(axis=0))
+            is_low = ok & (x <= self.closes.min(axis=0))
+        hs, ls, n = _shares(is_high, is_low, ok)
+        return {"date": pd.Timestamp(date), "high_share": float(hs), "low_share": float(ls),
+                "n_highs": int(is_high.sum()), "n_lows": int(is_low.sum()), "n_eligible": int(n)}
+
+    def rebase(self, panel: pd.DataFrame, rtol: float = RESTATE_TOL) -> bool:
+        """
+        State an ein (evtl. restatetes) Panel angleichen.
+        Adjusted Closes werden nach Splits/Dividenden rückwirkend mit einem
+        Faktor je Ticker skaliert: Faktor aus dem letzten gemeinsamen Bar,
+        passt die reskalierte Zeilen-Historie, übernimmt der State die
+        Panel-Werte. False → Revision ist kein reiner Faktor (z. B. Split
+        innerhalb des Fensters, korrigierter Bar) → Historie neu aufbauen.
+        """
+        if not len(self.dates) or not self.dates.isin(panel.index).all():
+            return False
+        cur = panel.reindex(index=self.dates, columns=self.tickers).to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = cur / self.closes
+        ok = np.isfinite(ratio)
+        last = len(ratio) - 1 - np.argmax(ok[::-1], axis=0)
+        factor = np.where(ok.any(axis=0), ratio[last, np.arange(ratio.shape[1])], 1.0)
+        if not np.allclose(cur, self.closes * factor, rtol=rtol, atol=0.0, equal_nan=True):
+            return False
+        self.closes = cur
+        return True
+
+    # ── Persistenz
+    def save(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                closes=self.closes,
+                dates=self.dates.values.astype("datetime64[ns]").astype(np.int64),
+                tickers=np.array(self.tickers, dtype=str),
+                window=np.array(self.window),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["BreadthState"]:
+        path = Path(path)
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as z:
+            return cls(
+                z["closes"],
+                pd.to_datetime(z["dates"].astype("datetime64[ns]")),
+                z["tickers"].tolist(),
+                int(z["window"]),
+            )
@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------
+#  EOD FETCH · Shared Price-Fetch Layer (EOD Historical Data)
+#  - Ein persistenter requests.Session (Keep-Alive, Connection-Pool)
+#  - Retry/Backoff für 429 / 5xx (respektiert Retry-After)
+#  - Rate-Limit pro Host (Token-Bucket, thread-safe)
+#  - fetch_many(): bounded ThreadPool, liefert {ticker: df}
+#  - fetch_aligned(): Dates × Ticker Panel
+#  - base_url konfigurierbar → testbar gegen lokalen Stub-Server
+#
+#  Ersetzt tools.prices_eodhd.tool_prices (lokales Modul, nicht im Repo):
+#  gleiche Signatur und gleiches Rückgabeformat (raw_to_prices), aber
+#  über den geteilten Session-Pool statt eines requests.get je Call.
+#  Token-Suche: $EODHD_API_TOKEN → TOKEN_PATHS (inkl. des bisherigen
+#  festen Pfads der economics-Downloader)
+# ------------------------------------------------------------------
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+BASE_URL = "https://eodhd.com/api"
+TOKEN_ENV = "EODHD_API_TOKEN"
+TOKEN_PATHS = (
+    Path.home() / "Documents/Python_for_Finance/api_token.txt",
+    Path("/Users/michelweiss/Documents/Python_for_Finance/api_token.txt"),
+    # bisheriger Pfad (nur auf case-insensitiven Dateisystemen identisch)
+    Path("/users/michelweiss/documents/python_for_finance/api_token.txt"),
+    Path.home() / "documents/python_for_finance/api_token.txt",
+)
+
+MAX_WORKERS = 8
+RATE_PER_SEC = 10.0     # Requests pro Sekunde und Host
+TIMEOUT = 30
+RETRIES = 3
+BACKOFF = 0.5           # 0.5s, 1s, 2s …
+
+
+def load_api_token() -> str:
+    """Token aus Env-Var oder aus der ersten vorhandenen Token-Datei (TOKEN_PATHS)."""
+    tok = os.environ.get(TOKEN_ENV)
+    if tok:
+        return tok.strip()
+    for path in TOKEN_PATHS:
+        if path.exists():
+            return path.read_text().strip()
+    tried = ", ".join(map(str, TOKEN_PATHS))
+    raise FileNotFoundError(f"API token not found (set {TOKEN_ENV} or create one of: {tried})")
+
+
+def raw_to_prices(raw: pd.DataFrame, adjusted: bool = True) -> pd.DataFrame:
+    """
+    EOD-Rohdaten → DatetimeIndex + Open/High/Low/Close/Volume.
+    adjusted=True → Close = adjusted_close (falls vorhanden).
+    """
+    if raw is None or raw.empty:
+        return pd.DataFrame()
+
+    out = raw.set_index("date")
+    out.index.name = "Date"
+    px_col = "adjusted_close" if adjusted and "adjusted_close" in out.columns else "close"
+    cols = {"open": "Open", "high": "High", "low": "Low", "volume": "Volume"}
+    df = out[[c for c in cols if c in out.columns]].rename(columns=cols)
+    df["Close"] = out[px_col].astype(float)
+    return df
+
+
+# ------------------------------------------------------------------
+# Rate-Limit je Host
+# ------------------------------------------------------------------
+class HostRateLimiter:
+    """Token-Bucket je Host: `rate` Requests/s, Burst bis `burst`."""
+
+    def __init__(self, rate: float = RATE_PER_SEC, burst: Optional[float] = None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1.0:
+                    self._buckets[host] = [tokens - 1.0, now]
+                    return
+                self._buckets[host] = [tokens, now]
+                wait = (1.0 - tokens) / self.rate
+            time.sleep(wait)
+
+
+# ------------------------------------------------------------------
+# Client
+# ------------------------------------------------------------------
+class EODClient:
+    """Gepoolter, rate-limitierter HTTP-Client für /eod/<ticker>."""
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        api_token: Optional[str] = None,
+        max_workers: int = MAX_WORKERS,
+        rate_per_sec: float = RATE_PER_SEC,
+        timeout: float = TIMEOUT,
+        retries: int = RETRIES,
+        backoff: float = BACKOFF,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self._token = api_token
+        self.max_workers = int(max_workers)
+        self.timeout = timeout
+        self.limiter = HostRateLimiter(rate_per_sec)
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max(self.max_workers, 1),
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def api_token(self) -> str:
+        if self._token is None:
+            self._token = load_api_token()
+        return self._token
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # ── raw
+    def get_json(self, path: str, params: Optional[dict] = None):
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        params = dict(params or {})
+        params.setdefault("fmt", "json")
+        params.setdefault("api_token", self.api_token)
+
+        self.limiter.acquire(urlparse(url).netloc)
+        r = self.session.get(url, params=params, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def fetch_eod_raw(self, ticker: str, start: str, end: Optional[str] = None) -> pd.DataFrame:
+        """EOD-Bars wie von der API geliefert (date, open, …, adjusted_close, volume)."""
+        params = {"from": start, "period": "d"}
+        if end:
+            params["to"] = end
+        data = self.get_json(f"eod/{ticker}", params)
+        df = pd.DataFrame(data)
+        if df.empty:
+            return df
+        df["date"] = pd.to_datetime(df["date"])
+        return df.sort_values("date").reset_index(drop=True)
+
+    # ── tool_prices-kompatibel
+    def fetch_prices(
+        self,
+        ticker: str,
+        start: str,
+        end: Optional[str] = None,
+        adjusted: bool = True,
+    ) -> pd.DataFrame:
+        """
+        DAILY prices mit DatetimeIndex und Spalten Open/High/Low/Close/Volume.
+        adjusted=True → Close = adjusted_close (falls vorhanden).
+        """
+        return raw_to_prices(self.fetch_eod_raw(ticker, start, end), adjusted)
+
+    def fetch_many(
+        self,
+        tickers: Iterable[str],
+        start: str,
+        end: Optional[str] = None,
+        adjusted: bool = True,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Lädt mehrere Ticker parallel (bounded Pool, ein Session-Pool).
+        Fehlgeschlagene Ticker → leerer DataFrame (mit Warnung).
+        """
+        return self.map_tickers(lambda tk: self.fetch_prices(tk, start, end, adjusted), tickers)
+
+    def map_tickers(self, fn: Callable[[str], pd.DataFrame], tickers: Iterable[str]) -> Dict[str, pd.DataFrame]:
+        """fn(ticker) je eindeutigem Ticker im bounded Pool; Fehler → leerer DataFrame."""
+        tickers = list(dict.fromkeys(tickers))
+
+        def one(tk):
+            try:
+                return tk, fn(tk)
+            except Exception as e:
+                # URL ohne Query ausgeben (enthält api_token)
+                print(f"⚠️  {tk}: fetch failed ({str(e).split('?')[0]})")
+                return tk, pd.DataFrame()
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(tickers) or 1))) as ex:
+            return dict(ex.map(one, tickers))
+
+    def fetch_aligned(
+        self,
+        tickers: Iterable[str],
+        start: str,
+        end: Optional[str] = None,
+        adjusted: bool = True,
+        field: str = "Close",
+    ) -> pd.DataFrame:
+        """Dates × Ticker Panel eines Feldes (Outer-Join, NaN = kein Bar)."""
+        frames = self.fetch_many(tickers, start, end, adjusted)
+        cols = {tk: df[field] for tk, df in frames.items() if not df.empty and field in df.columns}
+        if not cols:
+            return pd.DataFrame()
+        return pd.concat(cols, axis=1).sort_index()
+
+
+# ------------------------------------------------------------------
+# Shared Default-Client (ein Session-Pool pro Prozess)
+# ------------------------------------------------------------------
+_DEFAULT: Optional[EODClient] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def get_client(**kwargs) -> EODClient:
+    """Prozessweiter Client; kwargs nur beim ersten Aufruf wirksam."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = EODClient(**kwargs)
+        return _DEFAULT
+
+
+def tool_prices(ticker: str, start: str, end: Optional[str] = None, adjusted: bool = True) -> pd.DataFrame:
+    """
+    Ersatz für tools.prices_eodhd.tool_prices (gleiche Signatur, gleiches Format)
+    auf dem geteilten Session-Pool.
+    """
+    return get_client().fetch_prices(ticker, start, end, adjusted)
+
+
+def fetch_many(tickers: Iterable[str], start: str, end: Optional[str] = None, adjusted: bool = True) -> Dict[str, pd.DataFrame]:
+    return get_client().fetch_many(tickers, start, end, adjusted)
+
+
+def fetch_aligned(tickers: Iterable[str], start: str, end: Optional[str] = None, adjusted: bool = True, field: str = "Close") -> pd.DataFrame:
+    return get_client().fetch_aligned(tickers, start, end, adjusted, field)
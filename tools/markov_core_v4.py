@@ -24,13 +24,20 @@
 
 from __future__ import annotations
 
+import math
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-from typing import Dict, Tuple, Optional, Iterable
+from collections import OrderedDict, deque
+from typing import Dict, Tuple, Optional, Iterable, List
 import numpy as np
 import pandas as pd
 
+try:
+    from tools.markov_profile import profiled
+except ImportError:  # Direktaufruf aus tools/
+    from markov_profile import profiled
+
 # ------------------------------------------------------------------
 # Public constants
 # ------------------------------------------------------------------
@@ -43,6 +50,75 @@ WARMUP_BARS = {
     "monthly": 1260,   # ~5 Jahre
 }
 
+CACHE_MAXSIZE: int = 128   # LRU für preprocess_prices / compute_returns_horizon (0 = aus)
+
+# ------------------------------------------------------------------
+# Memo-Cache (content-addressed, bounded LRU)
+#  - Key = billiger Fingerprint (Länge, erster/letzter Index, Hash der
+#    letzten Zeilen, Spalten) + Parameter
+#  - Einträge sind read-only (Buffer writeable=False); Put und Treffer
+#    liefern eine flache View → ein Treffer kostet keine Kopie
+#  - Caller, die das Ergebnis in-place ändern, kopieren selbst (.copy());
+#    Schreiben in die View → ValueError (pandas < 3) bzw. Copy-on-Write
+# ------------------------------------------------------------------
+_CACHE: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+_FP_TAIL = 16
+
+
+def _fingerprint(df: pd.DataFrame) -> Optional[tuple]:
+    """Billiger Inhalts-Fingerprint eines Frames (None = nicht cachebar)."""
+    try:
+        tail = df.tail(_FP_TAIL)
+        h = int(pd.util.hash_pandas_object(tail, index=True).sum())
+        return (len(df), df.index[0], df.index[-1], tuple(map(str, df.columns)), h)
+    except Exception:
+        return None
+
+
+def _freeze(df: pd.DataFrame) -> pd.DataFrame:
+    """Buffer eines Cache-Eintrags read-only setzen (einmal beim Put)."""
+    for blk in getattr(df._mgr, "blocks", ()):
+        arr = getattr(blk, "values", None)
+        if isinstance(arr, np.ndarray):
+            arr.flags.writeable = False
+    return df
+
+
+def _cache_get(key: tuple) -> Optional[pd.DataFrame]:
+    hit = _CACHE.get(key)
+    if hit is None:
+        return None
+    _CACHE.move_to_end(key)
+    return hit.copy(deep=False)
+
+
+def _cache_put(key: tuple, df: pd.DataFrame) -> pd.DataFrame:
+    _CACHE[key] = _freeze(df)
+    _CACHE.move_to_end(key)
+    while len(_CACHE) > CACHE_MAXSIZE:
+        _CACHE.popitem(last=False)
+    return df.copy(deep=False)
+
+
+def clear_cache() -> None:
+    """Leert den Memo-Cache (z.B. nach Änderung von START)."""
+    _CACHE.clear()
+
+
+def _cached(tag: str, df: pd.DataFrame, params: tuple, fn) -> pd.DataFrame:
+    """Gemeinsamer Cache-Pfad: fn() nur bei Miss ausführen."""
+    if CACHE_MAXSIZE <= 0 or df is None or df.empty:
+        return fn()
+    fp = _fingerprint(df)
+    if fp is None:
+        return fn()
+    key = (tag, fp) + params
+    hit = _cache_get(key)
+    if hit is not None:
+        return hit
+    return _cache_put(key, fn())
+
+
 # ------------------------------------------------------------------
 # Helpers
 # ------------------------------------------------------------------
@@ -81,12 +157,20 @@ def _normalize_df(df_raw: pd.DataFrame) -> pd.DataFrame:
 # ------------------------------------------------------------------
 # Preprocessing (v4 = kein Resample, nur Clean + optional START-Filter)
 # ------------------------------------------------------------------
+@profiled()
 def preprocess_prices(df_raw: pd.DataFrame) -> pd.DataFrame:
     """
     v4: Keine kalenderfixe Aggregation.
     Nur Normalisierung, Sortierung, DropNA und optional START-Filter.
     Rolling-Windows werden im Caller via tail(window+K) gemacht.
+
+    Ergebnis wird memoisiert (siehe CACHE_MAXSIZE) und ist read-only;
+    vor In-place-Änderungen .copy() aufrufen.
     """
+    return _cached("prep", df_raw, (START,), lambda: _preprocess_prices(df_raw))
+
+
+def _preprocess_prices(df_raw: pd.DataFrame) -> pd.DataFrame:
     df = _normalize_df(df_raw)
     if df.empty:
         return df
@@ -117,67 +201,121 @@ def compute_returns(df: pd.DataFrame) -> pd.DataFrame:
     out["y_bin"] = (out["Returns"] > 0).astype(int)
     return out
 
+@profiled()
 def compute_returns_horizon(df: pd.DataFrame, horizon: int) -> pd.DataFrame:
     """
     Log-Returns über einen festen Trading-Day-Horizont (rolling).
     horizon = 1 / 5 / 21
+
+    Ergebnis wird memoisiert (siehe CACHE_MAXSIZE) und ist read-only;
+    vor In-place-Änderungen .copy() aufrufen.
     """
     if df is None or df.empty or horizon < 1:
         return pd.DataFrame()
 
+    return _cached("ret_h", df, (int(horizon),), lambda: _compute_returns_horizon(df, int(horizon)))
+
+
+def _compute_returns_horizon(df: pd.DataFrame, horizon: int) -> pd.DataFrame:
     out = df.copy()
     out["Returns"] = np.log(out["Close"] / out["Close"].shift(horizon))
     out = out.dropna(subset=["Close", "Returns"])
     out["y_bin"] = (out["Returns"] > 0).astype(int)
     return out
 
+# ------------------------------------------------------------------
+# State-Encoder (order-k, bit-packed) & Zählung via bincount
+# ------------------------------------------------------------------
+MAX_ORDER: int = 16
+
+
+def encode_states(y_bin: np.ndarray, order: int = 3) -> np.ndarray:
+    """
+    Packt je k aufeinanderfolgende y_bin-Werte in einen Integer-Code
+    (älteste Bar = höchstes Bit). Arbeitet entlang der letzten Achse.
+
+    Rückgabe: Codes für die Positionen order-1 .. n-1 (Länge n - order + 1).
+    Für order=3 identisch zu (a << 2) + (b << 1) + c.
+    """
+    k = int(order)
+    if k < 1 or k > MAX_ORDER:
+        raise ValueError(f"order must be in 1..{MAX_ORDER}")
+
+    y = np.asarray(y_bin, dtype=np.int64)
+    n = y.shape[-1]
+    if n < k:
+        return np.zeros(y.shape[:-1] + (0,), dtype=np.int64)
+
+    codes = np.zeros(y.shape[:-1] + (n - k + 1,), dtype=np.int64)
+    for j in range(k):
+        codes <<= 1
+        codes |= y[..., j:n - k + 1 + j]
+    return codes
+
+
+def decode_state(code: int, order: int = 3) -> Tuple[int, ...]:
+    """Code → State-Tupel (a, b, c, ...) wie in den Transition-Dicts."""
+    return tuple((int(code) >> (order - 1 - j)) & 1 for j in range(order))
+
+
+def count_states(
+    codes: np.ndarray,
+    y_next: np.ndarray,
+    order: int = 3,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Zählt Samples und Gewinne je State-Code mit np.bincount.
+    Rückgabe: (n, wins), jeweils Länge 2**order.
+    """
+    size = 1 << int(order)
+    n = np.bincount(codes, minlength=size)
+    wins = np.bincount(codes, weights=y_next, minlength=size).astype(np.int64)
+    return n, wins
+
+
+def _state_base(base: pd.DataFrame, ahead: int, order: int):
+    """Codes, y_next und Series-Index für eine Returns-Basis (y_bin)."""
+    y = base["y_bin"].to_numpy()
+    codes = encode_states(y, order)[: len(y) - order + 1 - ahead]
+    y_next = y[order - 1 + ahead:]
+    index = base.index[order - 1: len(y) - ahead]
+    return codes, y_next, index
+
+
+@profiled()
 def calc_transitions_horizon(
     df: pd.DataFrame,
     horizon: int,
     ahead: int = AHEAD,
     shrink_k: int = 15,
     return_series: bool = True,
+    order: int = 3,
 ):
     """
     Markov-Transitions auf Horizon-Returns mit Bayes-Shrinkage.
+    order = Anzahl Bars im State (Default 3).
     """
     base = compute_returns_horizon(df, horizon=horizon)
-    if base.empty or len(base) < ahead + 3:
+    if base.empty or len(base) < ahead + order:
         return {}, pd.Series(dtype=float)
 
-    y = base["y_bin"].to_numpy()
-    idx = np.arange(2, len(base) - ahead)
+    codes, y_next, index = _state_base(base, ahead, order)
+    n, wins = count_states(codes, y_next, order)
 
-    states = np.vstack([y[idx - 2], y[idx - 1], y[idx]]).T
-    states_tuples = [tuple(row) for row in states]
-    y_next = y[idx + ahead]
+    # Empirical Bayes Shrinkage → verhindert 0 / 1
+    with np.errstate(invalid="ignore"):
+        table = (wins + 0.5 * shrink_k) / (n + shrink_k)
+    table[n == 0] = np.nan
 
     trans = {}
-
-    st_arr = np.array(states_tuples, dtype=int)
-    codes = (st_arr[:, 0] << 2) + (st_arr[:, 1] << 1) + st_arr[:, 2]
-
-    for code in range(8):
-        mask = codes == code
-        if not np.any(mask):
-            continue
-
-        n = int(mask.sum())
-        wins = int(np.sum(y_next[mask] == 1))
-
-        # Empirical Bayes Shrinkage → verhindert 0 / 1
-        p_up = (wins + 0.5 * shrink_k) / (n + shrink_k)
-
-        a = (code >> 2) & 1
-        b = (code >> 1) & 1
-        c = code & 1
-        trans[(a, b, c)] = {"0": 1.0 - p_up, "1": p_up, "n": n}
+    for code in np.nonzero(n)[0]:
+        p_up = float(table[code])
+        trans[decode_state(code, order)] = {"0": 1.0 - p_up, "1": p_up, "n": int(n[code])}
 
     if not return_series:
         return trans, pd.Series(dtype=float)
 
-    p_up_vals = [trans.get(s, {"1": np.nan})["1"] for s in states_tuples]
-    p_up_series = pd.Series(p_up_vals, index=base.index[idx], name="p_up")
+    p_up_series = pd.Series(table[codes], index=index, name="p_up")
 
     return trans, p_up_series
 
@@ -188,8 +326,9 @@ def calc_transitions_horizon(
 def calc_transitions(
     df: pd.DataFrame,
     ahead: int = AHEAD,
-    return_series: bool = True
-) -> Tuple[Dict[Tuple[int, int, int], Dict[str, float]], pd.Series]:
+    return_series: bool = True,
+    order: int = 3,
+) -> Tuple[Dict[Tuple[int, ...], Dict[str, float]], pd.Series]:
     """
     Schätzt 3-State-Markov-Übergangswahrscheinlichkeiten basierend auf y_bin.
     Rückgabe:
@@ -197,39 +336,29 @@ def calc_transitions(
       - p_up_series: Serie (Index aligniert), die je Zeile p_up(state_t) trägt
 
     v4: Identisch zu v3, nur ohne freq/resample-Logik.
+    order > 3 erlaubt längere Memories (Keys dann k-Tupel).
     """
     base = compute_returns(df)
-    if base.empty or len(base) < ahead + 3:
+    if base.empty or len(base) < ahead + order:
         return {}, pd.Series(dtype=float)
 
-    y = base["y_bin"].to_numpy()
-    idx = np.arange(2, len(base) - ahead)  # (t-2,t-1,t) existiert & t+ahead existiert
-
-    states = np.vstack([y[idx - 2], y[idx - 1], y[idx]]).T
-    states_tuples = [tuple(row) for row in states]
-    y_next = y[idx + ahead]
+    # (t-k+1 .. t) existiert & t+ahead existiert
+    codes, y_next, index = _state_base(base, ahead, order)
+    n, wins = count_states(codes, y_next, order)
 
-    trans: Dict[Tuple[int, int, int], Dict[str, float]] = {}
+    with np.errstate(invalid="ignore"):
+        table = wins / n
+    table[n == 0] = np.nan
 
-    if len(states_tuples) > 0:
-        st_arr = np.array(states_tuples, dtype=int)
-        codes = (st_arr[:, 0] << 2) + (st_arr[:, 1] << 1) + st_arr[:, 2]  # 0..7
-
-        for code in range(8):
-            mask = codes == code
-            if not np.any(mask):
-                continue
-            p_up = float(np.mean(y_next[mask] == 1))
-            a = (code >> 2) & 1
-            b = (code >> 1) & 1
-            c = code & 1
-            trans[(a, b, c)] = {"0": 1.0 - p_up, "1": p_up}
+    trans: Dict[Tuple[int, ...], Dict[str, float]] = {}
+    for code in np.nonzero(n)[0]:
+        p_up = float(table[code])
+        trans[decode_state(code, order)] = {"0": 1.0 - p_up, "1": p_up}
 
     if not return_series:
         return trans, pd.Series(dtype=float)
 
-    p_up_vals = [trans.get(s, {"1": np.nan})["1"] for s in states_tuples]
-    p_up_series = pd.Series(p_up_vals, index=base.index[idx], name="p_up")
+    p_up_series = pd.Series(table[codes], index=index, name="p_up")
 
     return trans, p_up_series
 
@@ -255,6 +384,7 @@ def rolling_slice(df_raw: pd.DataFrame, window: int, ahead: int = AHEAD) -> pd.D
     return df.tail(need)
 
 
+@profiled()
 def rolling_p_up_last(
     df_raw: pd.DataFrame,
     freq: str,
@@ -321,9 +451,768 @@ def rolling_p_up_mean(df_raw: pd.DataFrame, window: int, ahead: int = AHEAD) ->
     return float(p_ser.mean()) if p_ser is not None and not p_ser.empty else float("nan")
 
 
+def rolling_p_up_history(
+    df_raw: pd.DataFrame,
+    freq: str,
+    horizon: int,
+    ahead: int = AHEAD,
+    shrink_k: int = 15,
+) -> pd.DataFrame:
+    """
+    Walk-forward p_up je Datum in O(n): Wert bei t = rolling_p_up_last auf
+    allen Daten bis inkl. t (gleiches Warm-up-Fenster, out-of-sample).
+
+    Statt pro Datum neu zu zählen werden kumulierte win/n-Indikatoren je
+    State gebildet; Fenster-Counts sind dann Differenzen zweier Zeilen.
+
+    Rückgabe: DataFrame (Index = Datum) mit 'p_up' und 'n_samples'.
+    """
+    df = preprocess_prices(df_raw)
+    if df is None or df.empty:
+        return pd.DataFrame(columns=["p_up", "n_samples"])
+
+    W = int(WARMUP_BARS.get(freq, 756))
+    h = int(horizon)
+    ahead = int(ahead)
+
+    close = df["Close"].to_numpy(dtype=float)
+    N = len(close)
+    p_out = np.full(N, np.nan)
+    n_out = np.zeros(N, dtype=np.int64)
+
+    if h < 1 or N <= h:
+        return pd.DataFrame({"p_up": p_out, "n_samples": n_out}, index=df.index)
+
+    # Horizon-Returns an Close-Position j (j >= h), ungültige wie dropna
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = np.full(N, np.nan)
+        ret[h:] = np.log(close[h:] / close[:-h])
+    valid = ~np.isnan(ret)
+    y = (ret[valid] > 0).astype(np.int64)
+    M = len(y)
+
+    # cv[t] = Anzahl gültiger Returns mit Position <= t
+    cv = np.cumsum(valid)
+    t = np.arange(N)
+    hi = cv - 1
+    left = t - W + h
+    lo = np.where(left >= 0, cv[np.clip(left, 0, None)], 0)
+    L = hi - lo + 1
+
+    if M < 3:
+        return pd.DataFrame({"p_up": p_out, "n_samples": n_out}, index=df.index)
+
+    codes = np.full(M, -1, dtype=np.int64)
+    codes[2:] = encode_states(y, 3)
+
+    # Kumulierte Indikatoren: Transition an State-Position k mit y[k+ahead]
+    ok = np.zeros(M, dtype=bool)
+    ok[2:max(M - ahead, 2)] = True
+    onehot = np.zeros((M + 1, 8), dtype=np.int64)
+    pos = np.nonzero(ok)[0]
+    onehot[pos + 1, codes[pos]] = 1
+    win_hot = np.zeros((M + 1, 8), dtype=np.int64)
+    win_hot[pos + 1, codes[pos]] = y[pos + ahead]
+    cn = np.cumsum(onehot, axis=0)
+    cw = np.cumsum(win_hot, axis=0)
+
+    rows = np.nonzero(L >= ahead + 3)[0]
+    if rows.size == 0:
+        return pd.DataFrame({"p_up": p_out, "n_samples": n_out}, index=df.index)
+
+    a_idx = lo[rows] + 2
+    b_idx = hi[rows] - ahead + 1
+    n_win = cn[b_idx] - cn[a_idx]
+    w_win = cw[b_idx] - cw[a_idx]
+
+    c_last = codes[hi[rows] - ahead]
+    c_now = codes[hi[rows]]
+    r = np.arange(rows.size)
+    p_out[rows] = (w_win[r, c_last] + 0.5 * shrink_k) / (n_win[r, c_last] + shrink_k)
+    n_out[rows] = n_win[r, c_now]
+
+    return pd.DataFrame({"p_up": p_out, "n_samples": n_out}, index=df.index)
+
+
+# ------------------------------------------------------------------
+# Panel-Engine (viele Ticker auf einmal, vektorisiert)
+#  - Input: aligniertes Preis-Panel (Dates × Ticker), NaN = kein Bar
+#  - Pro Ticker identische Semantik wie rolling_p_up_last
+#    (dropna → tail(warmup) → Horizon-Returns → 3-State + Shrinkage)
+# ------------------------------------------------------------------
+def _compact_right(mat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Schiebt je Zeile alle Nicht-NaN-Werte (Reihenfolge bleibt) an das rechte
+    Ende. Entspricht einem zeilenweisen dropna() mit rechtsbündiger Ausrichtung.
+    Rückgabe: (Matrix, Anzahl gültiger Werte je Zeile)
+    """
+    mat = np.asarray(mat, dtype=float)
+    valid = ~np.isnan(mat)
+    order = np.argsort(valid, axis=1, kind="stable")
+    return np.take_along_axis(mat, order, axis=1), valid.sum(axis=1)
+
+
+def panel_tail(panel: pd.DataFrame, bars: int) -> pd.DataFrame:
+    """
+    Kürzester Zeilen-Tail des Panels, der je Ticker die letzten `bars`
+    gültigen Closes enthält (bzw. die ganze Historie, wenn kürzer).
+    p_up / Threshold des neuesten Bars hängen nur davon ab → gleiches
+    Ergebnis wie auf dem vollen Panel, ohne die Historie zu kompaktieren.
+    """
+    bars = int(bars)
+    if panel is None or len(panel) <= bars:
+        return panel
+    seen = np.cumsum(panel.notna().to_numpy()[::-1], axis=0)
+    target = np.maximum(np.minimum(seen[-1], bars), 1)
+    back = np.argmax(seen >= target, axis=0)   # Zeilen ab Ende; nie gültig → 0
+    return panel.iloc[len(panel) - 1 - int(back.max()):]
+
+
+def panel_from_frames(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Baut aus {ticker: df_raw} ein Close-Panel (DatetimeIndex × Ticker).
+    Jeder Frame wird wie in preprocess_prices normalisiert; fehlende Bars = NaN.
+    """
+    cols = {}
+    for tk, raw in (dfs or {}).items():
+        try:
+            df = preprocess_prices(raw)
+        except Exception:
+            continue  # fehlerhafter Frame → Ticker fehlt im Panel (Zeile = NaN)
+        if df is not None and not df.empty:
+            cols[tk] = df["Close"]
+    if not cols:
+        return pd.DataFrame()
+    return pd.concat(cols, axis=1).sort_index()
+
+
+def panel_transitions_horizon(
+    closes: np.ndarray,
+    horizon: int,
+    ahead: int = AHEAD,
+    shrink_k: int = 15,
+) -> Dict[str, np.ndarray]:
+    """
+    Markov-Transitions auf Horizon-Returns für alle Zeilen einer Close-Matrix
+    (Ticker × Bars, rechtsbündig, führende NaN erlaubt) in wenigen NumPy-Pässen.
+
+    Rückgabe (Arrays, eine Zeile je Ticker):
+      - "codes"  : State-Code 0..7 je Return-Position (-1 = kein State)
+      - "wins"   : Gewinne je State, Shape (T, 8)
+      - "n"      : Samples je State, Shape (T, 8)
+      - "p_up"   : geschrumpftes p_up je State, Shape (T, 8)
+      - "p_last" : p_up des letzten Series-Eintrags (wie rolling_p_up_last)
+      - "n_last" : n des aktuellen States (letzte 3 y_bin)
+    """
+    closes = np.asarray(closes, dtype=float)
+    if closes.ndim != 2:
+        raise ValueError("closes must be a 2D array (tickers × bars)")
+
+    T, W = closes.shape
+    h = int(horizon)
+    ahead = int(ahead)
+
+    n = np.zeros((T, 8), dtype=np.int64)
+    wins = np.zeros((T, 8), dtype=np.int64)
+    p_last = np.full(T, np.nan)
+    n_last = np.zeros(T, dtype=np.int64)
+
+    if W <= h + 2 or h < 1:
+        return {
+            "codes": np.full((T, 0), -1, dtype=np.int64), "wins": wins, "n": n,
+            "p_up": np.full((T, 8), np.nan), "p_last": p_last, "n_last": n_last,
+        }
+
+    # Horizon-Returns exakt wie compute_returns_horizon (inkl. dropna)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = np.log(closes[:, h:] / closes[:, :-h])
+    ret, L = _compact_right(ret)
+    M = ret.shape[1]
+
+    y = (ret > 0).astype(np.int64)
+    codes = np.full((T, M), -1, dtype=np.int64)
+    codes[:, 2:] = encode_states(y, 3)
+    codes[np.arange(M)[None, :] < (M - L + 2)[:, None]] = -1
+
+    # Zählbare Positionen: State existiert & y[t+ahead] existiert
+    last_pos = M - 1 - ahead
+    if last_pos >= 2:
+        sub = codes[:, 2:last_pos + 1]
+        y_next = y[:, 2 + ahead:M]
+        ok = sub >= 0
+        flat = (sub + 8 * np.arange(T)[:, None])[ok]
+        n = np.bincount(flat, minlength=8 * T).reshape(T, 8)
+        wins = np.bincount(flat, weights=y_next[ok], minlength=8 * T)
+        wins = wins.reshape(T, 8).astype(np.int64)
+
+    # Empirical Bayes Shrinkage → verhindert 0 / 1 (shrink_k=0: n == 0 → NaN)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_up = (wins + 0.5 * shrink_k) / (n + shrink_k)
+    p_up[n == 0] = np.nan
+
+    has_series = L >= ahead + 3
+    rows = np.nonzero(has_series)[0]
+    if rows.size:
+        p_last[rows] = p_up[rows, codes[rows, last_pos]]
+        n_last[rows] = n[rows, codes[rows, M - 1]]
+
+    return {
+        "codes": codes, "wins": wins, "n": n,
+        "p_up": p_up, "p_last": p_last, "n_last": n_last,
+    }
+
+
+def panel_p_up_last(
+    panel: pd.DataFrame,
+    freq: str,
+    horizon: int,
+    ahead: int = AHEAD,
+    shrink_k: int = 15,
+) -> pd.DataFrame:
+    """
+    Vektorisierte Variante von rolling_p_up_last(..., return_n=True) für ein
+    ganzes Close-Panel (Dates × Ticker).
+
+    Rückgabe: DataFrame (Index = Ticker) mit Spalten 'p_up' und 'n_samples'.
+    """
+    if panel is None or panel.empty:
+        return pd.DataFrame(columns=["p_up", "n_samples"])
+    res = panel_p_up_multi(panel, {freq: horizon}, ahead=ahead, shrink_k=shrink_k)
+    return res[freq]
+
+
+# ------------------------------------------------------------------
+# Multi-Horizon in einem Pass (1/5/21 + beliebige weitere Horizonte)
+# ------------------------------------------------------------------
+DEFAULT_HORIZONS = {
+    "daily":   1,
+    "weekly":  5,
+    "monthly": 21,
+}
+
+
+def _horizon_spec(horizons=None, warmups=None) -> Dict[str, Tuple[int, int]]:
+    """
+    Normalisiert die Horizon-/Warm-up-Angaben zu {label: (horizon, warmup)}.
+      horizons: {label: horizon} oder Liste von Horizonten (Label = "<h>d")
+      warmups : {label: bars}, ein int für alle, oder None (→ WARMUP_BARS)
+    """
+    if horizons is None:
+        horizons = DEFAULT_HORIZONS
+    if not isinstance(horizons, dict):
+        horizons = {f"{int(h)}d": int(h) for h in horizons}
+
+    spec = {}
+    for label, h in horizons.items():
+        if isinstance(warmups, dict):
+            w = warmups.get(label, WARMUP_BARS.get(label, 756))
+        elif warmups is not None:
+            w = warmups
+        else:
+            w = WARMUP_BARS.get(label, 756)
+        spec[label] = (int(h), int(w))
+    return spec
+
+
+@profiled()
+def panel_p_up_multi(
+    panel: pd.DataFrame,
+    horizons=None,
+    warmups=None,
+    ahead: int = AHEAD,
+    shrink_k: int = 15,
+) -> pd.DataFrame:
+    """
+    p_up / n_samples für alle Ticker eines Close-Panels und alle Horizonte.
+    Das Panel wird nur einmal kompaktiert; je Horizon bleibt ein NumPy-Pass.
+
+    Rückgabe: DataFrame (Index = Ticker), Spalten-MultiIndex (label, p_up|n_samples).
+    """
+    spec = _horizon_spec(horizons, warmups)
+    cols = pd.MultiIndex.from_product([list(spec), ["p_up", "n_samples"]])
+    if panel is None or panel.empty:
+        return pd.DataFrame(columns=cols)
+
+    panel = panel_tail(panel, max(w for _, w in spec.values()))
+    closes, _ = _compact_right(panel.to_numpy(dtype=float).T)
+
+    data = {}
+    for label, (h, w) in spec.items():
+        res = panel_transitions_horizon(closes[:, -w:], horizon=h, ahead=ahead, shrink_k=shrink_k)
+        data[(label, "p_up")] = res["p_last"]
+        data[(label, "n_samples")] = res["n_last"]
+
+    return pd.DataFrame(data, index=pd.Index(panel.columns, name="Ticker"), columns=cols)
+
+
+def rolling_p_up_multi(
+    df_raw: pd.DataFrame,
+    horizons=None,
+    warmups=None,
+    ahead: int = AHEAD,
+    shrink_k: int = 15,
+) -> Dict[str, Dict[str, float]]:
+    """
+    rolling_p_up_last(..., return_n=True) für mehrere Horizonte einer Serie
+    in einem Pass (preprocess nur einmal).
+
+    Rückgabe: {label: {"horizon", "warmup", "p_up", "n_samples"}}
+    """
+    spec = _horizon_spec(horizons, warmups)
+    df = preprocess_prices(df_raw)
+    if df is None or df.empty:
+        res = pd.DataFrame()
+    else:
+        res = panel_p_up_multi(df[["Close"]], horizons, warmups, ahead=ahead, shrink_k=shrink_k)
+
+    out = {}
+    for label, (h, w) in spec.items():
+        if res.empty:
+            p, n = float("nan"), 0
+        else:
+            p = float(res[(label, "p_up")].iloc[0])
+            n = int(res[(label, "n_samples")].iloc[0])
+        out[label] = {"horizon": h, "warmup": w, "p_up": p, "n_samples": n}
+    return out
+
+
+# ------------------------------------------------------------------
+# Inkrementeller Count-Store (ein Objekt je Serie × Horizon)
+#  - hält die y_bin des Warm-up-Fensters + win/n-Zähler je State
+#  - neuer Close → neue Transition rein, abgelaufene raus (O(1))
+#  - Ergebnis identisch zu rolling_p_up_last(..., return_n=True)
+# ------------------------------------------------------------------
+class TransitionCounter:
+    """
+    Rolling 3-State-Zähler für genau eine Serie und einen Horizon.
+
+    Fenster-Semantik wie rolling_p_up_last: die letzten `warmup` Closes,
+    daraus (warmup - horizon) Horizon-Returns. Nicht-finite Closes/Returns
+    werden übersprungen.
+    """
+
+    def __init__(
+        self,
+        horizon: int,
+        warmup: int = 756,
+        ahead: int = AHEAD,
+        shrink_k: int = 15,
+    ):
+        self.horizon = int(horizon)
+        self.warmup = int(warmup)
+        self.ahead = int(ahead)
+        self.shrink_k = shrink_k
+        if self.horizon < 1 or self.warmup <= self.horizon:
+            raise ValueError("need horizon >= 1 and warmup > horizon")
+
+        self.closes = deque(maxlen=self.horizon + 1)
+        self.y = deque(maxlen=self.warmup - self.horizon)
+        self.n = [0] * 8
+        self.wins = [0] * 8
+        self.last_ts: Optional[pd.Timestamp] = None
+
+    # ── intern
+    def _code_at(self, i: int) -> int:
+        y = self.y
+        return (y[i - 2] << 2) | (y[i - 1] << 1) | y[i]
+
+    # ── Updates
+    def update(self, close: float, ts=None) -> float:
+        """Nimmt einen neuen Close auf und liefert das aktuelle p_up."""
+        close = float(close)
+        if ts is not None:
+            self.last_ts = pd.Timestamp(ts)
+        if not np.isfinite(close):
+            return self.p_up
+
+        self.closes.append(close)
+        if len(self.closes) <= self.horizon:
+            return self.p_up
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ret = np.log(close / self.closes[0])
+        if np.isnan(ret):
+            return self.p_up
+
+        a = self.ahead
+        # Fenster voll → älteste gezählte Transition läuft ab
+        if len(self.y) == self.y.maxlen and len(self.y) >= a + 3:
+            code = self._code_at(2)
+            self.n[code] -= 1
+            self.wins[code] -= self.y[2 + a]
+
+        self.y.append(int(ret > 0))
+
+        L = len(self.y)
+        if L >= a + 3:
+            code = self._code_at(L - 1 - a)
+            self.n[code] += 1
+            self.wins[code] += self.y[-1]
+
+        return self.p_up
+
+    def update_from_frame(self, df_raw: pd.DataFrame) -> float:
+        """Hängt nur Bars an, die nach dem zuletzt gesehenen Timestamp liegen."""
+        df = preprocess_prices(df_raw)
+        if df.empty:
+            return self.p_up
+        if self.last_ts is not None:
+            df = df.loc[df.index > self.last_ts]
+        for ts, close in zip(df.index, df["Close"].to_numpy()):
+            self.update(close, ts)
+        return self.p_up
+
+    @classmethod
+    def from_prices(
+        cls,
+        df_raw: pd.DataFrame,
+        freq: str,
+        horizon: int,
+        ahead: int = AHEAD,
+        shrink_k: int = 15,
+    ) -> "TransitionCounter":
+        """Initialisiert den Store aus einer Preis-Historie (Warm-up je freq)."""
+        obj = cls(horizon, WARMUP_BARS.get(freq, 756), ahead=ahead, shrink_k=shrink_k)
+        df = preprocess_prices(df_raw).tail(obj.warmup)
+        obj.update_from_frame(df)
+        return obj
+
+    # ── Abfragen
+    def _p(self, code: int) -> float:
+        n = self.n[code]
+        if n <= 0:
+            return float("nan")
+        return (self.wins[code] + 0.5 * self.shrink_k) / (n + self.shrink_k)
+
+    @property
+    def p_up(self) -> float:
+        """p_up wie rolling_p_up_last (State am letzten Series-Eintrag)."""
+        L = len(self.y)
+        if L < self.ahead + 3:
+            return float("nan")
+        return self._p(self._code_at(L - 1 - self.ahead))
+
+    @property
+    def state(self) -> Optional[Tuple[int, int, int]]:
+        """Aktueller State (letzte 3 y_bin) oder None."""
+        if len(self.y) < 3:
+            return None
+        return (self.y[-3], self.y[-2], self.y[-1])
+
+    @property
+    def n_samples(self) -> int:
+        if len(self.y) < self.ahead + 3:
+            return 0
+        return int(self.n[self._code_at(len(self.y) - 1)])
+
+    def transitions(self) -> Dict[Tuple[int, int, int], Dict[str, float]]:
+        """Transition-Dict im Format von calc_transitions_horizon."""
+        trans = {}
+        for code in range(8):
+            if self.n[code] <= 0:
+                continue
+            p_up = self._p(code)
+            key = ((code >> 2) & 1, (code >> 1) & 1, code & 1)
+            trans[key] = {"0": 1.0 - p_up, "1": p_up, "n": int(self.n[code])}
+        return trans
+
+    # ── Persistenz (JSON-tauglich)
+    def to_dict(self) -> dict:
+        return {
+            "horizon": self.horizon,
+            "warmup": self.warmup,
+            "ahead": self.ahead,
+            "shrink_k": self.shrink_k,
+            "closes": list(self.closes),
+            "y": list(self.y),
+            "n": list(self.n),
+            "wins": list(self.wins),
+            "last_ts": self.last_ts.isoformat() if self.last_ts is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "TransitionCounter":
+        obj = cls(d["horizon"], d["warmup"], ahead=d["ahead"], shrink_k=d["shrink_k"])
+        obj.closes.extend(float(c) for c in d["closes"])
+        obj.y.extend(int(v) for v in d["y"])
+        obj.n = [int(v) for v in d["n"]]
+        obj.wins = [int(v) for v in d["wins"]]
+        obj.last_ts = pd.Timestamp(d["last_ts"]) if d.get("last_ts") else None
+        return obj
+
+
+# ------------------------------------------------------------------
+# Streaming-Estimator (Intraday, ein Tick nach dem anderen, ohne pandas)
+#  - __slots__, fixe NumPy-Ringbuffer (Closes, y_bin, State-Codes)
+#  - Integer-State-Register (order-k, bit-packed wie encode_states)
+#  - konstanter Speicher, O(1) je Tick
+# ------------------------------------------------------------------
+class MarkovStream:
+    """
+    Rolling order-k Markov-Schätzer für einen Tick-Strom.
+
+    Fenster-Semantik wie rolling_p_up_last: die letzten `warmup` Closes,
+    daraus (warmup - horizon) Horizon-Returns. Nicht-finite Ticks werden
+    ignoriert.
+    """
+
+    __slots__ = (
+        "horizon", "warmup", "ahead", "shrink_k", "order",
+        "_mask", "_px", "_px_pos", "_px_len",
+        "_y", "_codes", "_pos", "_len", "_seen",
+        "_state", "_n", "_wins",
+    )
+
+    def __init__(
+        self,
+        horizon: int = 1,
+        warmup: int = 756,
+        ahead: int = AHEAD,
+        shrink_k: int = 15,
+        order: int = 3,
+    ):
+        self.horizon = int(horizon)
+        self.warmup = int(warmup)
+        self.ahead = int(ahead)
+        self.shrink_k = shrink_k
+        self.order = int(order)
+        if self.horizon < 1 or self.warmup <= self.horizon:
+            raise ValueError("need horizon >= 1 and warmup > horizon")
+        if not 1 <= self.order <= MAX_ORDER:
+            raise ValueError(f"order must be in 1..{MAX_ORDER}")
+
+        self._mask = (1 << self.order) - 1
+
+        self._px = np.zeros(self.horizon + 1, dtype=np.float64)
+        self._px_pos = 0
+        self._px_len = 0
+
+        size = self.warmup - self.horizon
+        self._y = np.zeros(size, dtype=np.int8)
+        self._codes = np.zeros(size, dtype=np.int64)
+        self._pos = 0       # nächster Schreibindex
+        self._len = 0       # y_bin im Fenster
+        self._seen = 0      # y_bin insgesamt (für State-Register)
+
+        self._state = 0
+        self._n = np.zeros(1 << self.order, dtype=np.int64)
+        self._wins = np.zeros(1 << self.order, dtype=np.int64)
+
+    def _at(self, i: int) -> int:
+        """Ringindex der logischen Position i (0 = älteste im Fenster)."""
+        return (self._pos - self._len + i) % len(self._y)
+
+    def push(self, close: float) -> float:
+        """Verarbeitet einen Tick und liefert das aktuelle p_up."""
+        close = float(close)
+        if not math.isfinite(close):
+            return self.p_up
+
+        h1 = self.horizon + 1
+        self._px[self._px_pos] = close
+        self._px_pos = (self._px_pos + 1) % h1
+        if self._px_len < h1:
+            self._px_len += 1
+            if self._px_len < h1:
+                return self.p_up
+
+        ref = self._px[self._px_pos]  # Close vor `horizon` Ticks
+        if ref == 0:
+            return self.p_up
+        ratio = close / ref
+        if not ratio >= 0:  # log(ratio) undefiniert → wie dropna
+            return self.p_up
+        y_new = int(ratio > 1)
+
+        k, a = self.order, self.ahead
+        size = len(self._y)
+
+        # Fenster voll → älteste gezählte Transition läuft ab
+        if self._len == size:
+            if size >= a + k:
+                code = self._codes[self._at(k - 1)]
+                self._n[code] -= 1
+                self._wins[code] -= self._y[self._at(k - 1 + a)]
+            self._len -= 1
+
+        self._state = ((self._state << 1) | y_new) & self._mask
+        self._seen += 1
+        self._y[self._pos] = y_new
+        self._codes[self._pos] = self._state
+        self._pos = (self._pos + 1) % size
+        self._len += 1
+
+        L = self._len
+        if L >= a + k:
+            code = self._codes[self._at(L - 1 - a)]
+            self._n[code] += 1
+            self._wins[code] += y_new
+
+        return self.p_up
+
+    def extend(self, closes) -> float:
+        """Mehrere Ticks nacheinander (z.B. Warm-up aus einem Array)."""
+        for c in closes:
+            self.push(c)
+        return self.p_up
+
+    @property
+    def ready(self) -> bool:
+        return self._len >= self.ahead + self.order
+
+    @property
+    def state(self) -> int:
+        """Aktueller State-Code (letzte `order` y_bin) oder -1."""
+        return int(self._state) if self._seen >= self.order else -1
+
+    @property
+    def p_up(self) -> float:
+        if not self.ready:
+            return float("nan")
+        code = self._codes[self._at(self._len - 1 - self.ahead)]
+        n = self._n[code]
+        if n <= 0:
+            return float("nan")
+        return (int(self._wins[code]) + 0.5 * self.shrink_k) / (int(n) + self.shrink_k)
+
+    @property
+    def n(self) -> int:
+        """Samples des aktuellen States im Fenster."""
+        if not self.ready:
+            return 0
+        return int(self._n[self._state])
+
+
 # ------------------------------------------------------------------
 # Default-Threshold (optional – bleibt wie v3)
 # ------------------------------------------------------------------
+THRESHOLD_GRID = np.linspace(0.30, 0.70, 21)
+
+
+def optimize_thresholds(
+    p: np.ndarray,
+    r: np.ndarray,
+    grid: Optional[np.ndarray] = None,
+    default: float = 0.55,
+) -> np.ndarray:
+    """
+    Batch-Optimizer: bester Threshold je Zeile (Ticker) in einer Reduktion.
+
+    p, r: (Ticker × Zeit), r = Return nach dem Signal; NaN = kein Sample.
+    perf(t) = Σ log1p(sign·r) mit sign = +1 wenn p >= t sonst -1.
+
+    Statt Grid × Zeit zu broadcasten wird jedes p in seinen Grid-Bucket
+    einsortiert; perf je Threshold ist dann eine Suffix-Summe über die
+    Buckets → O(T·N + T·G), auch für Grids mit 200+ Punkten.
+    """
+    grid = THRESHOLD_GRID if grid is None else np.asarray(grid, dtype=float)
+    p = np.atleast_2d(np.asarray(p, dtype=float))
+    r = np.atleast_2d(np.asarray(r, dtype=float))
+    T, G = p.shape[0], len(grid)
+
+    ok = ~np.isnan(r)
+    p = np.where(np.isnan(p), 0.5, p)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        up = np.where(ok, np.log1p(r), 0.0)
+        dn = np.where(ok, np.log1p(-r), 0.0)
+
+    # Bucket b: Anzahl Grid-Punkte <= p  →  p >= grid[g]  ⇔  g < b
+    b = np.searchsorted(grid, p, side="right")
+    flat = (b + (G + 1) * np.arange(T)[:, None])[ok]
+    gain = np.bincount(flat, weights=(up - dn)[ok], minlength=T * (G + 1))
+    gain = gain.reshape(T, G + 1)
+
+    # perf[g] = Σ dn + Σ_{b > g} (up - dn)
+    suffix = np.cumsum(gain[:, ::-1], axis=1)[:, ::-1]
+    perf = dn.sum(axis=1)[:, None] + suffix[:, 1:]
+    perf = np.where(np.isnan(perf), -np.inf, perf)
+
+    best = grid[np.argmax(perf, axis=1)]
+    empty = ~ok.any(axis=1) | ~np.isfinite(perf).any(axis=1)
+    return np.where(empty, default, best)
+
+
+def walk_forward_thresholds(
+    p: np.ndarray,
+    r: np.ndarray,
+    window: int = 252,
+    step: int = 21,
+    grid: Optional[np.ndarray] = None,
+    default: float = 0.55,
+) -> np.ndarray:
+    """
+    Walk-forward Re-Estimation: alle `step` Bars wird je Ticker der beste
+    Threshold auf den letzten `window` Samples davor geschätzt (out-of-sample)
+    und bis zur nächsten Schätzung gehalten.
+
+    Rückgabe: Matrix (Ticker × Zeit), NaN vor der ersten Schätzung.
+    """
+    p = np.atleast_2d(np.asarray(p, dtype=float))
+    r = np.atleast_2d(np.asarray(r, dtype=float))
+    T, N = p.shape
+    out = np.full((T, N), np.nan)
+
+    starts = list(range(int(window), N, int(step)))
+    for i, e in enumerate(starts):
+        stop = starts[i + 1] if i + 1 < len(starts) else N
+        thr = optimize_thresholds(p[:, e - window:e], r[:, e - window:e], grid, default)
+        out[:, e:stop] = thr[:, None]
+    return out
+
+
+def panel_threshold_inputs(closes: np.ndarray, ahead: int = AHEAD) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (p, r)-Matrizen wie in default_threshold_func für alle Zeilen einer
+    Close-Matrix (Ticker × Bars, rechtsbündig): p = ungeschrumpftes 3-State
+    p_up (calc_transitions), r = Log-Return `ahead` Bars später.
+    """
+    res = panel_transitions_horizon(closes, horizon=1, ahead=ahead, shrink_k=0)
+    codes = res["codes"]
+    T, M = codes.shape
+    p = np.full((T, M), np.nan)
+    r = np.full((T, M), np.nan)
+    if M == 0:
+        return p, r
+
+    with np.errstate(invalid="ignore"):
+        table = res["wins"] / res["n"]
+    rows = np.arange(T)[:, None]
+    p_all = table[rows, np.clip(codes, 0, None)]
+
+    closes = np.asarray(closes, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = np.log(closes[:, 1:] / closes[:, :-1])
+    ret, _ = _compact_right(ret)
+
+    # p-Serie endet bei M-1-ahead; shift(-ahead) darin → letztes Paar bei M-1-2·ahead
+    j = np.arange(M)
+    ok = (codes >= 0) & (j[None, :] + ahead <= M - 1 - ahead)
+    r_next = np.full((T, M), np.nan)
+    if M > ahead:
+        r_next[:, :M - ahead] = ret[:, ahead:]
+    p[ok] = p_all[ok]
+    r[ok] = r_next[ok]
+    return p, r
+
+
+def panel_thresholds(
+    panel: pd.DataFrame,
+    threshold_window: int = 63,
+    grid: Optional[np.ndarray] = None,
+) -> pd.Series:
+    """
+    default_threshold_func für alle Ticker eines Close-Panels auf einmal
+    (je Ticker auf den letzten threshold_window + 3 + AHEAD + 1 Bars).
+    """
+    if panel is None or panel.empty:
+        return pd.Series(dtype=float)
+    need = int(threshold_window) + 3 + AHEAD + 1
+    closes, _ = _compact_right(panel_tail(panel, need).to_numpy(dtype=float).T)
+    p, r = panel_threshold_inputs(closes[:, -need:])
+    thr = optimize_thresholds(p, r, grid)
+    return pd.Series(thr, index=pd.Index(panel.columns, name="Ticker"), name="Threshold")
+
+
 def default_threshold_func(df: pd.DataFrame) -> float:
     """
     Robuster Fallback-Optimizer: grid über 0.30..0.70 und wählt den besten CumRet
@@ -336,20 +1225,43 @@ def default_threshold_func(df: pd.DataFrame) -> float:
         rets = compute_returns(df)["Returns"].reindex(p_ser.index).shift(-AHEAD).dropna()
         p = p_ser.reindex(rets.index).fillna(0.5).to_numpy()
         r = rets.to_numpy()
-        best_t, best_perf = 0.55, -np.inf
-        for t in np.linspace(0.30, 0.70, 21):
-            sign = np.where(p >= t, 1.0, -1.0)
-            perf = np.sum(np.log1p(sign * r))
-            if perf > best_perf:
-                best_perf, best_t = perf, t
-        return float(best_t)
+        return float(optimize_thresholds(p, r)[0])
     except Exception:
         return 0.55
 
-
 # ------------------------------------------------------------------
 # Rolling Trend Matrix (für Financial)
 # ------------------------------------------------------------------
+def panel_trend_matrix(
+    panel: pd.DataFrame,
+    windows: Optional[Dict[str, int]] = None,
+    threshold_window: int = 63,
+    tickers: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Trend-Matrix (p_up_daily / p_up_week / p_up_month / Threshold) direkt auf
+    einem Close-Panel – ein panel_p_up_multi- und ein panel_thresholds-Pass.
+    Entspricht create_rolling_trend_matrix(use_last=True, Default-Threshold).
+    """
+    if windows is None:
+        windows = {"daily": 1, "weekly": 5, "monthly": 21}
+
+    cols = {"daily": "p_up_daily", "weekly": "p_up_week", "monthly": "p_up_month"}
+    if tickers is None:
+        tickers = [] if panel is None else list(panel.columns)
+
+    out = pd.DataFrame(index=pd.Index(tickers, name="Ticker"))
+    res = panel_p_up_multi(panel, {freq: int(windows[freq]) for freq in cols})
+    for freq, col in cols.items():
+        out[col] = res[(freq, "p_up")].reindex(out.index) if not res.empty else np.nan
+
+    out["Threshold"] = panel_thresholds(panel, threshold_window).reindex(out.index).fillna(0.55)
+
+    for c in ["p_up_daily", "p_up_week", "p_up_month", "Threshold"]:
+        out[c] = pd.to_numeric(out[c], errors="coerce")
+    return out
+
+
 def create_rolling_trend_matrix(
     dfs: Dict[str, pd.DataFrame],
     windows: Optional[Dict[str, int]] = None,
@@ -364,7 +1276,7 @@ def create_rolling_trend_matrix(
       daily=1, weekly=5, monthly=21 (Trading Days)
 
     use_last:
-      True  -> rolling_p_up_last (empfohlen für "Regime jetzt")
+      True  -> panel_p_up_multi (= rolling_p_up_last, alle Ticker/Horizonte vektorisiert)
       False -> rolling_p_up_mean
 
     Threshold:
@@ -374,40 +1286,51 @@ def create_rolling_trend_matrix(
     if windows is None:
         windows = {"daily": 1, "weekly": 5, "monthly": 21}
 
-    rows = []
-    for tk, raw in (dfs or {}).items():
-        try:
-            fn = rolling_p_up_last if use_last else rolling_p_up_mean
-
-            p_d = fn(raw, windows["daily"])
-            p_w = fn(raw, windows["weekly"])
-            p_m = fn(raw, windows["monthly"])
-
-            # Threshold auf recent history (rolling) – optional
-            df_thr = preprocess_prices(raw).tail(int(threshold_window) + 3 + AHEAD + 1)
-            thr = float(threshold_func(df_thr)) if df_thr is not None and not df_thr.empty else 0.55
-
-            rows.append({
-                "Ticker": tk,
-                "p_up_daily": p_d,
-                "p_up_week": p_w,
-                "p_up_month": p_m,
-                "Threshold": thr,
-            })
-
-        except Exception:
-            rows.append({
-                "Ticker": tk,
-                "p_up_daily": np.nan,
-                "p_up_week": np.nan,
-                "p_up_month": np.nan,
-                "Threshold": np.nan,
-            })
-
-    if not rows:
+    cols = {"daily": "p_up_daily", "weekly": "p_up_week", "monthly": "p_up_month"}
+    tickers = list((dfs or {}).keys())
+    if not tickers:
         return pd.DataFrame()
 
-    out = pd.DataFrame(rows).set_index("Ticker")
+    # Einmal normalisieren → gemeinsames Panel für alle Ticker
+    panel = panel_from_frames(dfs)
+
+    if use_last and threshold_func is default_threshold_func:
+        return panel_trend_matrix(panel, windows, threshold_window, tickers)
+
+    out = pd.DataFrame(index=pd.Index(tickers, name="Ticker"))
+    if use_last:
+        res = panel_p_up_multi(panel, {freq: int(windows[freq]) for freq in cols})
+        for freq, col in cols.items():
+            out[col] = res[(freq, "p_up")].reindex(out.index) if not res.empty else np.nan
+    else:
+        def _mean(tk, h):
+            # je Ticker abgesichert: ein fehlerhafter Frame → NaN statt Abbruch
+            try:
+                return rolling_p_up_mean(dfs[tk], h)
+            except Exception:
+                return np.nan
+
+        for freq, col in cols.items():
+            out[col] = [_mean(tk, int(windows[freq])) for tk in tickers]
+
+    # Threshold auf recent history (rolling) – optional
+    if threshold_func is default_threshold_func:
+        # Batch-Optimizer über alle Ticker (gleiche Semantik, ein NumPy-Pass)
+        thr = panel_thresholds(panel, threshold_window).reindex(out.index).fillna(0.55)
+    else:
+        need = int(threshold_window) + 3 + AHEAD + 1
+        thr = []
+        for tk in tickers:
+            try:
+                if tk in panel.columns:
+                    df_thr = panel[[tk]].dropna().rename(columns={tk: "Close"}).tail(need)
+                else:
+                    df_thr = pd.DataFrame()
+                thr.append(float(threshold_func(df_thr)) if not df_thr.empty else 0.55)
+            except Exception:
+                thr.append(np.nan)
+    out["Threshold"] = thr
+
     for c in ["p_up_daily", "p_up_week", "p_up_month", "Threshold"]:
         if c in out.columns:
             out[c] = pd.to_numeric(out[c], errors="coerce")
@@ -423,9 +1346,9 @@ if __name__ == "__main__":
     px = 100 * np.exp(rnd.cumsum())
     df = pd.DataFrame({"Close": px}, index=rng)
 
-    print("rolling_p_up_last daily(1):", rolling_p_up_last(df, 1))
-    print("rolling_p_up_last weekly(5):", rolling_p_up_last(df, 5))
-    print("rolling_p_up_last monthly(21):", rolling_p_up_last(df, 21))
+    print("rolling_p_up_last daily(1):", rolling_p_up_last(df, "daily", 1))
+    print("rolling_p_up_last weekly(5):", rolling_p_up_last(df, "weekly", 5))
+    print("rolling_p_up_last monthly(21):", rolling_p_up_last(df, "monthly", 21))
 
     tm = create_rolling_trend_matrix({"DEMO": df})
     print("\nRolling TrendMatrix:\n", tm)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------
+#  MARKOV PROFILE · Opt-in Hot-Path Instrumentation
+#  - Aktivierung: Env-Var MARKOV_PROFILE=1 oder `with profiling():`
+#  - Erfasst je Name: Aufrufe, Wall-Time (inklusive), verarbeitete Rows
+#  - @profiled für Core-Funktionen, stage() für Builder-Stufen
+#    (fetch / normalize / compute / persist)
+#  - dump_profile() schreibt JSON neben die Output-Snapshots
+#  - Deaktiviert: ein Bool-Check je Aufruf, sonst nichts
+# ------------------------------------------------------------------
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+ENV_VAR = "MARKOV_PROFILE"
+
+
+class _State:
+    __slots__ = ("enabled", "stats", "lock", "started")
+
+    def __init__(self):
+        self.enabled = os.environ.get(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+        self.stats: Dict[str, list] = {}
+        self.lock = threading.Lock()
+        self.started = datetime.now()
+
+
+_STATE = _State()
+
+
+def profile_enabled() -> bool:
+    return _STATE.enabled
+
+
+def _record(name: str, seconds: float, rows: int):
+    with _STATE.lock:
+        s = _STATE.stats.get(name)
+        if s is None:
+            _STATE.stats[name] = [1, seconds, rows]
+        else:
+            s[0] += 1
+            s[1] += seconds
+            s[2] += rows
+
+
+def _len(obj) -> int:
+    try:
+        return len(obj)
+    except Exception:
+        return 0
+
+
+# ------------------------------------------------------------------
+# Decorator (Core-Funktionen)
+# ------------------------------------------------------------------
+def profiled(name: Optional[str] = None, rows: Optional[Callable] = None):
+    """
+    Misst eine Funktion, wenn Profiling aktiv ist.
+    rows(args, result) → Anzahl verarbeiteter Zeilen;
+    Default: len() des ersten Arguments.
+    """
+    def deco(fn):
+        key = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _STATE.enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            result = fn(*args, **kwargs)
+            dt = time.perf_counter() - t0
+            if rows is not None:
+                n = rows(args, result)
+            else:
+                n = _len(args[0]) if args else _len(next(iter(kwargs.values()), None))
+            _record(key, dt, int(n or 0))
+            return result
+
+        return wrapper
+
+    return deco
+
+
+# ------------------------------------------------------------------
+# Stage-Context (Builder-Stufen)
+# ------------------------------------------------------------------
+class _Stage:
+    __slots__ = ("rows",)
+
+    def __init__(self, rows: int = 0):
+        self.rows = rows
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def rows(self):
+        return 0
+
+    @rows.setter
+    def rows(self, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+@contextmanager
+def _timed_stage(name: str, rows: int):
+    st = _Stage(rows)
+    t0 = time.perf_counter()
+    try:
+        yield st
+    finally:
+        _record(name, time.perf_counter() - t0, int(st.rows or 0))
+
+
+def stage(name: str, rows: int = 0):
+    """
+    Zeitmessung für eine Builder-Stufe:
+
+        with stage("equity.fetch") as st:
+            df = tool_prices(...)
+            st.rows = len(df)
+    """
+    if not _STATE.enabled:
+        return _NULL_STAGE
+    return _timed_stage(name, rows)
+
+
+# ------------------------------------------------------------------
+# Steuerung & Export
+# ------------------------------------------------------------------
+def reset_profile():
+    with _STATE.lock:
+        _STATE.stats.clear()
+        _STATE.started = datetime.now()
+
+
+@contextmanager
+def profiling(reset: bool = True):
+    """Aktiviert Profiling für den Block (unabhängig von der Env-Var)."""
+    prev = _STATE.enabled
+    if reset:
+        reset_profile()
+    _STATE.enabled = True
+    try:
+        yield
+    finally:
+        _STATE.enabled = prev
+
+
+def profile_snapshot() -> dict:
+    """Aktueller Stand als JSON-taugliches Dict (sortiert nach Zeit)."""
+    with _STATE.lock:
+        items = sorted(_STATE.stats.items(), key=lambda kv: kv[1][1], reverse=True)
+        entries = {
+            k: {
+                "calls": c,
+                "seconds": round(t, 6),
+                "rows": r,
+                "ms_per_call": round(t / c * 1e3, 4) if c else 0.0,
+            }
+            for k, (c, t, r) in items
+        }
+    return {
+        "started": _STATE.started.isoformat(timespec="seconds"),
+        "dumped": datetime.now().isoformat(timespec="seconds"),
+        "pid": os.getpid(),
+        "entries": entries,
+    }
+
+
+def dump_profile(path: Path) -> Optional[Path]:
+    """Schreibt das Profil als JSON (nur wenn Profiling aktiv ist)."""
+    if not _STATE.enabled:
+        return None
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile_snapshot(), f, indent=2)
+    print(f"⏱  profile written: {path}")
+    return path
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------
+#  META MARKOV · Cross-Asset Joint-State Engine
+#  - je Asset ein Risk-On-Bit je Bar: (C_t − C_{t−h}) > 0
+#    (Serien sind Risk-On orientiert: Equity, HY/IG-Spread, −log(VIX))
+#  - je Asset ein Order-k State (Default 3 Bits, wie markov_core_v4)
+#  - Joint State = bit-gepackte Asset-States (uint64-Wörter, 64//k Assets
+#    je Wort) → beliebig viele Assets
+#  - Ziel-Klasse: Anteil Risk-On-Assets `ahead` Bars später
+#    ≥ bull_share → BULL, ≤ bear_share → BEAR, sonst NEUTRAL
+#  - Zählung sparse: nur beobachtete Joint States (np.unique + bincount),
+#    Speicher O(beobachtete States), nicht 2^(k·Assets)
+#  - Shrinkage: Joint-Counts → Mittel der Marginal-Modelle (je Asset
+#    P(Klasse | Asset-State)), diese → globale Klassen-Häufigkeit
+# ------------------------------------------------------------------
+
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from tools.markov_core_v4 import AHEAD, encode_states, decode_state
+except ImportError:  # Aufruf aus tools/
+    from markov_core_v4 import AHEAD, encode_states, decode_state
+
+REGIMES = ("BEAR", "NEUTRAL", "BULL")
+ORDER = 3
+SHRINK_K = 15
+BULL_SHARE = 2.0 / 3.0
+BEAR_SHARE = 1.0 / 3.0
+
+
+# ------------------------------------------------------------------
+# Bits, States, Packing
+# ------------------------------------------------------------------
+def risk_on_bits(closes: np.ndarray, horizon: int) -> np.ndarray:
+    """Dates × Assets Closes (ohne NaN) → int8 Bits (C_t − C_{t−h}) > 0."""
+    c = np.asarray(closes, dtype=float)
+    if c.shape[0] <= horizon:
+        return np.zeros((0, c.shape[1]), dtype=np.int8)
+    return (c[horizon:] - c[:-horizon] > 0).astype(np.int8)
+
+
+def asset_states(bits: np.ndarray, order: int = ORDER) -> np.ndarray:
+    """Order-k State-Codes je Asset; Zeile i ↔ Bit-Position order-1+i."""
+    return encode_states(bits.T, order).T
+
+
+def pack_joint(codes: np.ndarray, order: int = ORDER) -> np.ndarray:
+    """Positions × Assets Codes → Positions × Wörter uint64 (bit-gepackt)."""
+    codes = np.asarray(codes, dtype=np.uint64)
+    per_word = 64 // order
+    n_words = max(1, -(-codes.shape[1] // per_word))
+    out = np.zeros((codes.shape[0], n_words), dtype=np.uint64)
+    for a in range(codes.shape[1]):
+        w, slot = divmod(a, per_word)
+        out[:, w] |= codes[:, a] << np.uint64(slot * order)
+    return out
+
+
+def joint_hex(key: np.ndarray) -> str:
+    """Joint-State-Key als Hex (höchstes Wort zuerst)."""
+    return "".join(f"{int(w):016x}" for w in key[::-1])
+
+
+def regime_class(bits: np.ndarray, bull_share: float = BULL_SHARE, bear_share: float = BEAR_SHARE) -> np.ndarray:
+    """Anteil Risk-On-Assets je Bar → 0 (BEAR) / 1 (NEUTRAL) / 2 (BULL)."""
+    share = bits.mean(axis=1) if bits.shape[1] else np.zeros(bits.shape[0])
+    cls = np.ones(len(share), dtype=np.int64)
+    cls[share >= bull_share] = 2
+    cls[share <= bear_share] = 0
+    return cls
+
+
+# ------------------------------------------------------------------
+# Engine
+# ------------------------------------------------------------------
+class MetaMarkov:
+    """Joint-State Markov über alle Assets mit sparse Counts und Shrinkage."""
+
+    def __init__(
+        self,
+        order: int = ORDER,
+        shrink_k: float = SHRINK_K,
+        marginal_k: float = SHRINK_K,
+        bull_share: float = BULL_SHARE,
+        bear_share: float = BEAR_SHARE,
+    ):
+        self.order = int(order)
+        self.shrink_k = float(shrink_k)
+        self.marginal_k = float(marginal_k)
+        self.bull_share = bull_share
+        self.bear_share = bear_share
+        self.assets: list = []
+        self.keys = np.zeros((0, 1), dtype=np.uint64)
+        self.counts = np.zeros((0, 3), dtype=np.int64)
+        self._index: Dict[bytes, int] = {}
+        self.marginal = np.zeros((0, 1 << self.order, 3))
+        self.base = np.full(3, 1.0 / 3.0)
+        self.current_codes: Optional[np.ndarray] = None
+        self.as_of = None
+
+    def fit(self, closes: pd.DataFrame, horizon: int = 5, ahead: int = AHEAD) -> "MetaMarkov":
+        """
+        closes: Dates × Assets (Risk-On orientiert, ohne NaN).
+        Zählt State(t) → Klasse(t+ahead) für alle Positionen mit bekanntem Ausgang.
+        """
+        closes = closes.dropna()
+        self.assets = [str(c) for c in closes.columns]
+        self.as_of = closes.index[-1] if len(closes) else None
+
+        k = self.order
+        bits = risk_on_bits(closes.to_numpy(), horizon)
+        codes = asset_states(bits, k)
+        if len(codes) == 0:
+            raise ValueError("not enough aligned bars for meta-markov states")
+        self.current_codes = codes[-1]
+
+        cls = regime_class(bits, self.bull_share, self.bear_share)
+        n_fit = max(len(codes) - ahead, 0)
+        X, y = codes[:n_fit], cls[k - 1 + ahead:]
+
+        # globale Klassen-Häufigkeit (Prior der Marginals)
+        if n_fit:
+            self.base = np.bincount(y, minlength=3) / n_fit
+
+        # Marginal-Modelle: je Asset 2^k × 3 Counts (linear in #Assets)
+        size = 1 << k
+        a_idx = np.arange(X.shape[1])[None, :]
+        flat = ((a_idx * size + X) * 3 + y[:, None]).ravel()
+        m = np.bincount(flat, minlength=X.shape[1] * size * 3).reshape(X.shape[1], size, 3)
+        self.marginal = (m + self.marginal_k * self.base) / (m.sum(axis=2, keepdims=True) + self.marginal_k)
+
+        # Joint: nur beobachtete States
+        keys = pack_joint(X, k)
+        if n_fit:
+            uniq, inv = np.unique(keys, axis=0, return_inverse=True)
+            inv = np.asarray(inv).ravel()
+            self.keys = uniq
+            self.counts = np.bincount(inv * 3 + y, minlength=len(uniq) * 3).reshape(len(uniq), 3)
+        else:
+            self.keys = np.zeros((0, keys.shape[1]), dtype=np.uint64)
+            self.counts = np.zeros((0, 3), dtype=np.int64)
+        self._index = {row.tobytes(): i for i, row in enumerate(self.keys)}
+        return self
+
+    def prior(self, codes: np.ndarray) -> np.ndarray:
+        """Mittel der Marginal-Modelle P(Klasse | Asset-State)."""
+        return self.marginal[np.arange(len(codes)), codes].mean(axis=0)
+
+    def predict(self, codes: Optional[np.ndarray] = None) -> dict:
+        """Regime + Wahrscheinlichkeiten für einen Joint State (Default: aktueller)."""
+        codes = self.current_codes if codes is None else np.asarray(codes)
+        prior = self.prior(codes)
+        key = pack_joint(codes[None, :], self.order)[0]
+
+        i = self._index.get(key.tobytes())
+        counts = self.counts[i] if i is not None else np.zeros(3, dtype=np.int64)
+        n = int(counts.sum())
+        p = (counts + self.shrink_k * prior) / (n + self.shrink_k)
+
+        return {
+            "regime": REGIMES[int(np.argmax(p))],
+            "probabilities": {r: round(float(p[j]), 4) for j, r in enumerate(REGIMES)},
+            "prior": {r: round(float(prior[j]), 4) for j, r in enumerate(REGIMES)},
+            "n_joint": n,
+            "joint_state": joint_hex(key),
+            "asset_states": {
+                a: str(decode_state(int(c), self.order)) for a, c in zip(self.assets, codes)
+            },
+            "observed_states": int(len(self.keys)),
+        }
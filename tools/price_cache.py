@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------
+#  PRICE CACHE · Inkrementeller On-Disk EOD-Cache
+#  - Eine .npz-Datei je Ticker (spaltenweise float64 + int64-Dates)
+#  - Update lädt nur from=last_cached_date und hängt an
+#    (letzter Bar wird überschrieben – evtl. revidiert)
+#  - Corporate-Action Re-Sync: ändert sich der Adjust-Faktor
+#    (adjusted_close / close) im Überlappungs-Bar → volle Historie neu
+#  - resync=True erzwingt Neuladen, offline=True liest nur den Cache
+#  - Netzfehler beim Update → gecachter Stand (mit Warnung)
+#  - Env: EOD_CACHE_DIR (Pfad), EOD_OFFLINE=1 (kein Netz)
+# ------------------------------------------------------------------
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import requests
+
+from tools.eod_fetch import EODClient, get_client, raw_to_prices
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.environ.get("EOD_CACHE_DIR", ROOT / "cache" / "eod"))
+OFFLINE = os.environ.get("EOD_OFFLINE", "").strip().lower() in ("1", "true", "yes", "on")
+
+DEFAULT_START = "2000-01-01"
+RESYNC_TOL = 1e-6       # rel. Abweichung des Adjust-Faktors → Re-Sync
+
+_START_KEY = "__start__"
+
+
+def _safe_name(ticker: str) -> str:
+    return "".join(c if c.isalnum() or c in "._-" else "_" for c in ticker)
+
+
+def _adj_factor(df: pd.DataFrame) -> Optional[pd.Series]:
+    if "adjusted_close" not in df.columns or "close" not in df.columns:
+        return None
+    close = df["close"].astype(float).replace(0.0, np.nan)
+    return pd.Series(df["adjusted_close"].astype(float).values / close.values, index=df["date"].values)
+
+
+class PriceCache:
+    """Ticker-Dateien unter `root`; Netz nur über den (geteilten) EODClient."""
+
+    def __init__(
+        self,
+        root: Path = CACHE_DIR,
+        client: Optional[EODClient] = None,
+        offline: bool = OFFLINE,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._client = client
+        self.offline = offline
+
+    @property
+    def client(self) -> EODClient:
+        if self._client is None:
+            self._client = get_client()
+        return self._client
+
+    def path(self, ticker: str) -> Path:
+        return self.root / f"{_safe_name(ticker)}.npz"
+
+    # ── Disk I/O
+    def load(self, ticker: str) -> pd.DataFrame:
+        """Gecachte Rohdaten (date, open, …, adjusted_close, volume) oder leer."""
+        df, _ = self._load(ticker)
+        return df
+
+    def _load(self, ticker: str):
+        p = self.path(ticker)
+        if not p.exists():
+            return pd.DataFrame(), None
+        with np.load(p, allow_pickle=False) as z:
+            start = str(z[_START_KEY]) if _START_KEY in z.files else None
+            cols = {k: z[k] for k in z.files if k not in ("date", _START_KEY)}
+            df = pd.DataFrame({"date": pd.to_datetime(z["date"].astype("datetime64[ns]"))})
+        for k, v in cols.items():
+            df[k] = v
+        return df, start
+
+    def save(self, ticker: str, df: pd.DataFrame, start: str):
+        arrays = {"date": df["date"].values.astype("datetime64[ns]").astype(np.int64)}
+        for c in df.columns:
+            if c == "date":
+                continue
+            v = pd.to_numeric(df[c], errors="coerce")
+            arrays[c] = v.to_numpy(dtype=np.float64)
+        arrays[_START_KEY] = np.array(start)
+
+        # atomar: tmp schreiben, dann ersetzen
+        p = self.path(ticker)
+        tmp = p.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, p)
+
+    # ── Update
+    def _full(self, ticker: str, start: str) -> pd.DataFrame:
+        df = self.client.fetch_eod_raw(ticker, start)
+        if not df.empty:
+            self.save(ticker, df, start)
+        return df
+
+    def update(self, ticker: str, start: str = DEFAULT_START, resync: bool = False) -> pd.DataFrame:
+        """
+        Bringt den Cache auf den neuesten Stand und liefert die Rohdaten.
+        - kein Cache / früherer start / resync → volle Historie ab start
+        - sonst Delta ab dem letzten Cache-Datum
+        - Netzfehler → gecachter Stand (ohne Cache: Fehler weiterreichen)
+        """
+        cached, cached_start = self._load(ticker)
+        if self.offline:
+            return cached
+        try:
+            return self._update(ticker, start, resync, cached, cached_start)
+        except requests.RequestException as e:
+            if cached.empty:
+                raise
+            # URL ohne Query ausgeben (enthält api_token)
+            print(f"⚠️  {ticker}: fetch failed – using cache up to "
+                  f"{cached['date'].iloc[-1]:%Y-%m-%d} ({str(e).split('?')[0]})")
+            return cached
+
+    def _update(self, ticker: str, start: str, resync: bool, cached: pd.DataFrame, cached_start) -> pd.DataFrame:
+        if (
+            resync
+            or cached.empty
+            or cached_start is None
+            or pd.Timestamp(start) < pd.Timestamp(cached_start)
+        ):
+            return self._full(ticker, start)
+
+        last = cached["date"].iloc[-1]
+        delta = self.client.fetch_eod_raw(ticker, last.strftime("%Y-%m-%d"))
+        if delta.empty:
+            return cached
+
+        # Corporate Action? Adjust-Faktor der Überlappung vergleichen
+        f_old, f_new = _adj_factor(cached), _adj_factor(delta)
+        if f_old is not None and f_new is not None:
+            common = f_new.index.intersection(f_old.index)
+            if len(common):
+                a = f_old.loc[common].values
+                b = f_new.loc[common].values
+                if np.any(np.abs(b / a - 1.0) > RESYNC_TOL):
+                    print(f"🔁 {ticker}: adjustment changed – re-sync full history")
+                    return self._full(ticker, cached_start)
+
+        keep = cached[cached["date"] < delta["date"].iloc[0]]
+        merged = pd.concat([keep, delta], ignore_index=True)
+        self.save(ticker, merged, cached_start)
+        return merged
+
+    # ── Lesen
+    def get_raw(
+        self,
+        ticker: str,
+        start: str = DEFAULT_START,
+        end: Optional[str] = None,
+        resync: bool = False,
+    ) -> pd.DataFrame:
+        df = self.update(ticker, start, resync=resync)
+        if df.empty:
+            return df
+        mask = df["date"] >= pd.Timestamp(start)
+        if end:
+            mask &= df["date"] <= pd.Timestamp(end)
+        return df.loc[mask].reset_index(drop=True)
+
+    def get_prices(
+        self,
+        ticker: str,
+        start: str = DEFAULT_START,
+        end: Optional[str] = None,
+        adjusted: bool = True,
+        resync: bool = False,
+    ) -> pd.DataFrame:
+        """tool_prices-Format (DatetimeIndex, Open/High/Low/Close/Volume)."""
+        return raw_to_prices(self.get_raw(ticker, start, end, resync), adjusted)
+
+    def get_many(
+        self,
+        tickers: Iterable[str],
+        start: str = DEFAULT_START,
+        end: Optional[str] = None,
+        adjusted: bool = True,
+        resync: bool = False,
+    ) -> Dict[str, pd.DataFrame]:
+        """Parallel über den bounded Pool des Clients (eine Datei je Ticker)."""
+        return self.client.map_tickers(
+            lambda tk: self.get_prices(tk, start, end, adjusted, resync), tickers
+        )
+
+
+# ------------------------------------------------------------------
+# Shared Default-Cache
+# ------------------------------------------------------------------
+_DEFAULT: Optional[PriceCache] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def get_cache(**kwargs) -> PriceCache:
+    """Prozessweiter Cache; kwargs nur beim ersten Aufruf wirksam."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = PriceCache(**kwargs)
+        return _DEFAULT
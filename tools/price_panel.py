@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------
+#  PRICE PANEL · Memory-mapped Dates × Ticker Store
+#  - <name>.panel.json : Manifest (Version, Verzeichnis, Shape) – wird als
+#                         letztes per os.replace getauscht → Reader sehen
+#                         immer einen vollständigen, konsistenten Stand
+#  - <name>.<version>/  : eine geschriebene Version
+#      values.npy   : float64/float32 Matrix (Dates × Ticker), Fortran-Order
+#                     → jede Ticker-Spalte liegt zusammenhängend auf Disk
+#      dates.npy    : int64 (datetime64[ns]) Trading-Kalender
+#      tickers.json : Ticker-Index
+#  - ältere Versionen werden aufgeräumt (die vorherige bleibt für Reader,
+#    die das alte Manifest schon gelesen haben)
+#  - open() nutzt np.load(mmap_mode="r") → Millisekunden, Pages werden
+#    zwischen Prozessen geteilt; Slices sind Views (zero-copy)
+#  - frame() liefert das Close-Panel für markov_core_v4.panel_p_up_multi,
+#    frames() den {ticker: df}-Dict für create_rolling_trend_matrix
+# ------------------------------------------------------------------
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+PANEL_DIR = Path(os.environ.get("PRICE_PANEL_DIR", ROOT / "cache" / "panel"))
+DEFAULT_NAME = "close"
+KEEP_VERSIONS = 2      # aktuelle + vorherige
+OPEN_RETRIES = 3
+
+
+def _manifest(path: Path, name: str) -> Path:
+    return Path(path) / f"{name}.panel.json"
+
+
+def _version_files(vdir: Path):
+    return vdir / "values.npy", vdir / "dates.npy", vdir / "tickers.json"
+
+
+def _cleanup(path: Path, name: str, current: str):
+    """Alte Versionen löschen; die letzten KEEP_VERSIONS bleiben."""
+    versions = sorted(p for p in Path(path).glob(f"{name}.v*") if p.is_dir())
+    for p in versions[:-KEEP_VERSIONS]:
+        if p.name != current:
+            shutil.rmtree(p, ignore_errors=True)
+
+
+def _atomic(target: Path, write):
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, target)
+
+
+class PricePanel:
+    """Dates × Ticker Preis-Matrix (typischerweise read-only memmap)."""
+
+    __slots__ = ("values", "dates", "tickers", "_col")
+
+    def __init__(self, values: np.ndarray, dates: pd.DatetimeIndex, tickers: Iterable[str]):
+        tickers = list(tickers)
+        if values.shape != (len(dates), len(tickers)):
+            raise ValueError(f"panel shape {values.shape} != ({len(dates)}, {len(tickers)})")
+        self.values = values
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = pd.Index(tickers, name="Ticker")
+        self._col = {tk: j for j, tk in enumerate(tickers)}
+
+    # ── Persistenz
+    @classmethod
+    def _load(cls, files, mmap: bool, shape) -> "PricePanel":
+        f_val, f_dates, f_tk = files
+        values = np.load(f_val, mmap_mode="r" if mmap else None)
+        if tuple(values.shape) != tuple(shape):
+            raise ValueError(f"panel shape {values.shape} != manifest {tuple(shape)}")
+        dates = pd.DatetimeIndex(np.load(f_dates).astype("datetime64[ns]"), name="Date")
+        with open(f_tk, "r", encoding="utf-8") as f:
+            tickers = json.load(f)
+        return cls(values, dates, tickers)
+
+    @classmethod
+    def open(cls, path: Path = PANEL_DIR, name: str = DEFAULT_NAME, mmap: bool = True) -> "PricePanel":
+        path = Path(path)
+        manifest = _manifest(path, name)
+        # Manifest → Version; verschwindet die Version zwischen Lesen und
+        # Öffnen (paralleler write + cleanup), Manifest neu lesen
+        for attempt in range(OPEN_RETRIES):
+            with open(manifest, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            try:
+                return cls._load(_version_files(path / meta["dir"]), mmap, meta["shape"])
+            except FileNotFoundError:
+                if attempt == OPEN_RETRIES - 1:
+                    raise
+                time.sleep(0.05)
+
+    @classmethod
+    def write(
+        cls,
+        data: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+        path: Path = PANEL_DIR,
+        name: str = DEFAULT_NAME,
+        field: str = "Close",
+        dtype=np.float64,
+    ) -> "PricePanel":
+        """
+        Schreibt ein Panel aus einem Dates × Ticker DataFrame oder aus
+        {ticker: df} (Spalte `field`, Outer-Join der Kalender) und öffnet es.
+        """
+        panel = data if isinstance(data, pd.DataFrame) else frames_to_panel(data, field)
+
+        path = Path(path)
+        values = np.asfortranarray(panel.to_numpy(dtype=dtype))
+        dates = pd.DatetimeIndex(panel.index).values.astype("datetime64[ns]").astype(np.int64)
+        tickers = [str(c) for c in panel.columns]
+
+        # 1) neue Version komplett in ein eigenes Verzeichnis
+        version = f"v{time.time_ns():020d}-{os.getpid()}"
+        vdir = path / f"{name}.{version}"
+        vdir.mkdir(parents=True, exist_ok=False)
+        f_val, f_dates, f_tk = _version_files(vdir)
+        with open(f_val, "wb") as f:
+            np.save(f, values)
+        with open(f_dates, "wb") as f:
+            np.save(f, dates)
+        with open(f_tk, "wb") as f:
+            f.write(json.dumps(tickers).encode("utf-8"))
+
+        # 2) ein atomarer Swap des Manifests macht sie sichtbar
+        meta = {"version": version, "dir": vdir.name, "shape": list(values.shape)}
+        _atomic(_manifest(path, name), lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+        _cleanup(path, name, vdir.name)
+        return cls.open(path, name)
+
+    # ── Index
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._col
+
+    def col(self, ticker: str) -> int:
+        try:
+            return self._col[ticker]
+        except KeyError:
+            raise KeyError(f"ticker not in panel: {ticker}") from None
+
+    def rows(self, start=None, end=None) -> slice:
+        """Zeilen-Slice für [start, end] über binäre Suche im Kalender."""
+        i0 = 0 if start is None else int(self.dates.searchsorted(pd.Timestamp(start), side="left"))
+        i1 = len(self.dates) if end is None else int(self.dates.searchsorted(pd.Timestamp(end), side="right"))
+        return slice(i0, i1)
+
+    # ── Zero-copy Slices
+    def window(self, start=None, end=None) -> np.ndarray:
+        """Dates × Ticker View für [start, end]."""
+        return self.values[self.rows(start, end)]
+
+    def series(self, ticker: str, start=None, end=None) -> np.ndarray:
+        """Eine Ticker-Spalte als View (zusammenhängend im Speicher)."""
+        return self.values[self.rows(start, end), self.col(ticker)]
+
+    def frame(self, start=None, end=None, tickers: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Dates × Ticker DataFrame. Ohne `tickers` ohne Kopie der Matrix;
+        eine Ticker-Auswahl wird kopiert (Fancy-Indexing).
+        """
+        rs = self.rows(start, end)
+        if tickers is None:
+            return pd.DataFrame(self.values[rs], index=self.dates[rs], columns=self.tickers, copy=False)
+        tickers = list(tickers)
+        idx = [self.col(tk) for tk in tickers]
+        return pd.DataFrame(
+            self.values[rs][:, idx], index=self.dates[rs],
+            columns=pd.Index(tickers, name="Ticker"),
+        )
+
+    def prices(self, ticker: str, start=None, end=None) -> pd.DataFrame:
+        """tool_prices-Format (DatetimeIndex, Close) ohne NaN-Bars."""
+        rs = self.rows(start, end)
+        s = pd.Series(self.values[rs, self.col(ticker)], index=self.dates[rs], name="Close")
+        return s.dropna().to_frame()
+
+    def frames(self, tickers: Optional[Iterable[str]] = None, start=None, end=None) -> Dict[str, pd.DataFrame]:
+        """{ticker: df(Close)} – Input für create_rolling_trend_matrix."""
+        return {tk: self.prices(tk, start, end) for tk in (tickers if tickers is not None else self.tickers)}
+
+
+def frames_to_panel(frames: Dict[str, pd.DataFrame], field: str = "Close") -> pd.DataFrame:
+    """{ticker: df} → Dates × Ticker (Outer-Join, NaN = kein Bar)."""
+    cols = {
+        tk: df[field].astype(float)
+        for tk, df in (frames or {}).items()
+        if df is not None and not df.empty and field in df.columns
+    }
+    if not cols:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="Date"))
+    panel = pd.concat(cols, axis=1).sort_index()
+    panel.index = pd.DatetimeIndex(panel.index, name="Date")
+    return panel
+
+
+def open_panel(name: str = DEFAULT_NAME, path: Path = PANEL_DIR) -> Optional[PricePanel]:
+    """Öffnet ein Panel (memmap) oder None, wenn es noch nicht geschrieben wurde."""
+    if not _manifest(path, name).exists():
+        return None
+    return PricePanel.open(path, name)